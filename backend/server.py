@@ -1,9 +1,13 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, UploadFile, File
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, UploadFile, File, Query, Request
+from fastapi.responses import StreamingResponse, FileResponse, JSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne, ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure, PyMongoError
 import os
+import asyncio
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict
@@ -14,6 +18,18 @@ from passlib.context import CryptContext
 from jose import JWTError, jwt
 import base64
 import httpx
+import httpcore
+import csv
+import io
+import json
+import re
+import hashlib
+import ipaddress
+import socket
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from PIL import Image, UnidentifiedImageError
 
 # LibreTranslate API configuration
 LIBRETRANSLATE_API_URL = os.environ.get('LIBRETRANSLATE_API_URL', 'https://libretranslate.com')
@@ -34,7 +50,6 @@ SECRET_KEY = os.environ.get('SECRET_KEY', 'shindora-secret-key-change-in-product
 ALGORITHM = "HS256"
 ADMIN_PASSWORD = "Emilia9@#$"
 
-app = FastAPI(title="ShinDora Nesub API")
 api_router = APIRouter(prefix="/api")
 
 # ===== MODELS =====
@@ -165,6 +180,10 @@ class AdBanner(BaseModel):
 class AdminLogin(BaseModel):
     password: str
 
+class WatchProgressUpdate(BaseModel):
+    position: float = Field(..., ge=0)  # seconds into the video
+    duration: Optional[float] = Field(None, ge=0)
+
 # ===== UTILS =====
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -178,6 +197,28 @@ def create_token(data: dict, expires_delta: timedelta = timedelta(days=7)):
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+class ReadCache:
+    """Short-lived in-process cache for hot, rarely-changing public reads."""
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: Dict[str, tuple] = {}
+
+    def get(self, key: str):
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+
+    def set(self, key: str, value):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        return value
+
+    def invalidate(self, *prefixes: str):
+        for key in [k for k in self._entries if k.startswith(prefixes)]:
+            del self._entries[key]
+
+read_cache = ReadCache(float(os.environ.get('READ_CACHE_TTL', '30')))
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     try:
         token = credentials.credentials
@@ -297,6 +338,102 @@ async def upload_avatar(file: UploadFile = File(...), user=Depends(get_current_u
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# ===== ANALYTICS =====
+# View/like/comment events are folded into hourly and daily rollup documents per
+# video and per category with upserted $inc buckets, so dashboard queries read a
+# bounded number of small documents regardless of traffic. Hourly buckets expire
+# via a TTL index; daily buckets are kept.
+ANALYTICS_HOURLY_RETENTION_DAYS = int(os.environ.get('ANALYTICS_HOURLY_RETENTION_DAYS', '14'))
+ANALYTICS_METRICS = ("views", "likes", "comments")
+ANALYTICS_COLLECTIONS = {"hour": "analytics_hourly", "day": "analytics_daily"}
+# Widest date range one query may cover, so results stay a bounded number of buckets
+ANALYTICS_MAX_RANGE_DAYS = {"hour": 31, "day": 366}
+# Recording runs after the response in its own task; held here so it isn't garbage collected
+analytics_tasks: set = set()
+
+async def record_analytics_event(metric: str, video_id: str, category: Optional[dict] = None, amount: int = 1):
+    """Count one event; category is looked up from the video when not given ({} means none)."""
+    now = datetime.now(timezone.utc)
+    buckets = {
+        "hour": (now.strftime("%Y-%m-%dT%H"), {"expires_at": now + timedelta(days=ANALYTICS_HOURLY_RETENTION_DAYS)}),
+        "day": (now.strftime("%Y-%m-%d"), {}),
+    }
+    try:
+        if category is None:
+            category = await get_video_category(video_id)
+        scopes = [("video", video_id)]
+        if category and category_key(category):
+            scopes.append(("category", category_key(category)))
+        
+        writes = []
+        for granularity, (bucket, on_insert) in buckets.items():
+            update = {"$inc": {metric: amount}}
+            if on_insert:
+                update["$setOnInsert"] = on_insert
+            ops = [
+                UpdateOne({"scope": scope, "key": key, "bucket": bucket}, update, upsert=True)
+                for scope, key in scopes
+            ]
+            writes.append(db[ANALYTICS_COLLECTIONS[granularity]].bulk_write(ops, ordered=False))
+        await asyncio.gather(*writes)
+    except Exception as e:
+        # Analytics must never fail the user-facing request
+        logger.error(f"Failed to record {metric} analytics for {video_id}: {e}")
+
+def track_analytics(metric: str, video_id: str, category: Optional[dict] = None, amount: int = 1):
+    """Record an analytics event in the background so the request doesn't wait on the rollup writes."""
+    task = asyncio.create_task(record_analytics_event(metric, video_id, category, amount))
+    analytics_tasks.add(task)
+    task.add_done_callback(analytics_tasks.discard)
+
+async def get_video_category(video_id: str) -> Optional[dict]:
+    video = await db.videos.find_one({"id": video_id}, {"_id": 0, "category": 1})
+    return video.get("category") if video else None
+
+@api_router.get("/admin/analytics")
+async def admin_get_analytics(
+    start: str,
+    end: str,
+    scope: str = "category",
+    key: Optional[str] = None,
+    granularity: str = "day",
+    admin=Depends(get_admin)
+):
+    """Rollups for an inclusive YYYY-MM-DD date range; scope=video needs a key."""
+    if scope not in ("video", "category"):
+        raise HTTPException(status_code=400, detail="Scope must be video or category")
+    if granularity not in ANALYTICS_COLLECTIONS:
+        raise HTTPException(status_code=400, detail="Granularity must be hour or day")
+    try:
+        start_date = datetime.strptime(start, "%Y-%m-%d")
+        end_date = datetime.strptime(end, "%Y-%m-%d")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be YYYY-MM-DD")
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="End date is before start date")
+    if (end_date - start_date).days >= ANALYTICS_MAX_RANGE_DAYS[granularity]:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Range may span at most {ANALYTICS_MAX_RANGE_DAYS[granularity]} days for {granularity} granularity"
+        )
+    # Categories are few; videos are not, so per-video rollups need an explicit key
+    if scope == "video" and not key:
+        raise HTTPException(status_code=400, detail="A video key is required for scope=video")
+    
+    # Hourly bucket ids ("2026-01-31T05") sort between the bare day and day + "T23"
+    upper = end if granularity == "day" else f"{end}T23"
+    query = {"scope": scope, "bucket": {"$gte": start, "$lte": upper}}
+    if key:
+        query["key"] = key
+    
+    rollups = await db[ANALYTICS_COLLECTIONS[granularity]].find(
+        query,
+        {"_id": 0, "key": 1, "bucket": 1, **{m: 1 for m in ANALYTICS_METRICS}}
+    ).sort([("key", 1), ("bucket", 1)]).to_list(None)
+    
+    totals = {m: sum(r.get(m, 0) for r in rollups) for m in ANALYTICS_METRICS}
+    return {"scope": scope, "granularity": granularity, "totals": totals, "buckets": rollups}
+
 # ===== VIDEO ROUTES =====
 @api_router.get("/videos")
 async def get_videos(category: Optional[str] = None, search: Optional[str] = None):
@@ -312,7 +449,14 @@ async def get_videos(category: Optional[str] = None, search: Optional[str] = Non
             {"title.en": {"$regex": search, "$options": "i"}}
         ]
     
+    if not query:
+        cached = read_cache.get("videos:latest")
+        if cached is not None:
+            return cached
+    
     videos = await db.videos.find(query, {"_id": 0}).sort("created_at", -1).to_list(100)
+    if not query:
+        read_cache.set("videos:latest", videos)
     return videos
 
 @api_router.get("/videos/{video_id}")
@@ -324,25 +468,289 @@ async def get_video(video_id: str):
 
 @api_router.post("/videos/{video_id}/view")
 async def increment_view(video_id: str):
-    await db.videos.update_one({"id": video_id}, {"$inc": {"views": 1}})
+    video = await db.videos.find_one_and_update(
+        {"id": video_id},
+        {"$inc": {"views": 1}},
+        projection={"_id": 0, "category": 1}
+    )
+    if video:
+        track_analytics("views", video_id, video.get("category") or {})
     return {"success": True}
 
 @api_router.post("/videos/{video_id}/like")
 async def like_video(video_id: str, user=Depends(get_current_user)):
-    await db.users.update_one(
+    result = await db.users.update_one(
         {"username": user["username"]},
         {"$addToSet": {"liked_videos": video_id}}
     )
+    if result.modified_count:
+        track_analytics("likes", video_id)
     return {"success": True}
 
 @api_router.delete("/videos/{video_id}/like")
 async def unlike_video(video_id: str, user=Depends(get_current_user)):
-    await db.users.update_one(
+    result = await db.users.update_one(
         {"username": user["username"]},
         {"$pull": {"liked_videos": video_id}}
     )
+    if result.modified_count:
+        track_analytics("likes", video_id, amount=-1)
     return {"success": True}
 
+# ===== EPISODE INDEX =====
+# One precomputed document per category holding its episodes in natural order
+# ("2" < "10" < "10.5"), so next/previous lookups are a single indexed read
+# instead of pulling and sorting the whole category client-side.
+EPISODE_NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+
+def episode_sort_key(label: str):
+    # Order by the first number in the label so "Episode 3" < "Episode 12";
+    # labels with no number at all ("OVA", "Special") go last, lexically
+    label = (label or "").strip()
+    match = EPISODE_NUMBER_RE.search(label)
+    if match:
+        return (0, float(match.group()), label[:match.start()].strip().lower(), label[match.end():].strip().lower())
+    return (1, 0.0, "", label.lower())
+
+def category_key(category: dict) -> str:
+    return category.get("en") or category.get("id") or ""
+
+async def rebuild_episode_index(category: dict):
+    key = category_key(category)
+    if not key:
+        return
+    videos = await db.videos.find(
+        {"$or": [{"category.en": key}, {"category.id": key}]},
+        {"_id": 0, "id": 1, "episode": 1, "title": 1, "thumbnail_url": 1, "created_at": 1}
+    ).to_list(None)
+    videos.sort(key=lambda v: (episode_sort_key(v.get("episode", "")), v.get("created_at", "")))
+    
+    if not videos:
+        await db.episode_index.delete_one({"category": key})
+        return
+    await db.episode_index.update_one(
+        {"category": key},
+        {"$set": {
+            "category": key,
+            "names": list({n for n in (category.get("id"), category.get("en")) if n}),
+            "video_ids": [v["id"] for v in videos],
+            "episodes": [
+                {
+                    "id": v["id"],
+                    "episode": v.get("episode", ""),
+                    "title": v.get("title"),
+                    "thumbnail_url": v.get("thumbnail_url", "")
+                }
+                for v in videos
+            ],
+            "updated_at": datetime.now(timezone.utc).isoformat()
+        }},
+        upsert=True
+    )
+
+async def rebuild_all_episode_indexes():
+    categories = await db.videos.distinct("category")
+    for category in categories:
+        await rebuild_episode_index(category)
+    # Categories that no longer have any videos would otherwise keep a stale index
+    keys = [category_key(c) for c in categories if category_key(c)]
+    await db.episode_index.delete_many({"category": {"$nin": keys}})
+
+@api_router.get("/videos/{video_id}/neighbors")
+async def get_video_neighbors(video_id: str):
+    index = await db.episode_index.find_one({"video_ids": video_id}, {"_id": 0})
+    if not index:
+        raise HTTPException(status_code=404, detail="Video not found")
+    
+    position = index["video_ids"].index(video_id)
+    episodes = index["episodes"]
+    return {
+        "category": index["category"],
+        "position": position,
+        "total": len(episodes),
+        "previous": episodes[position - 1] if position > 0 else None,
+        "next": episodes[position + 1] if position + 1 < len(episodes) else None
+    }
+
+@api_router.get("/categories/{category}/episodes")
+async def get_category_episodes(category: str):
+    index = await db.episode_index.find_one({"names": category}, {"_id": 0, "episodes": 1})
+    return index["episodes"] if index else []
+
+# ===== LIVE COMMENTS =====
+# Watch pages subscribe to a per-video Server-Sent Events stream instead of
+# re-polling GET /comments. Each worker keeps a short per-video history so a
+# reconnecting client (Last-Event-ID) only receives what it missed. Slow
+# clients get a bounded queue; on overflow they are dropped and simply resume
+# from history on reconnect.
+COMMENT_HISTORY_SIZE = 200
+COMMENT_HISTORY_VIDEOS = int(os.environ.get('COMMENT_HISTORY_VIDEOS', '500'))
+COMMENT_SUBSCRIBER_QUEUE_SIZE = 100
+COMMENT_KEEPALIVE_SECONDS = 15.0
+COMMENT_STREAM_RETRY_DELAY = 1.0
+
+class CommentSubscriber:
+    def __init__(self):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=COMMENT_SUBSCRIBER_QUEUE_SIZE)
+        self.lagged = False
+
+class CommentBroadcaster:
+    """Single-worker fan-out: publish() delivers straight to local subscribers."""
+    def __init__(self):
+        self._epoch = uuid.uuid4().hex[:8]
+        self._seq = 0
+        # LRU by last event; only the most recently active videos keep history
+        self._history: "OrderedDict[str, deque]" = OrderedDict()
+        self._subscribers: Dict[str, set] = {}
+
+    def subscribe(self, video_id: str, last_event_id: Optional[str] = None):
+        """Return (subscriber, missed events, reset) where reset means history cannot cover the gap."""
+        subscriber = CommentSubscriber()
+        self._subscribers.setdefault(video_id, set()).add(subscriber)
+        
+        backlog, reset = [], False
+        if last_event_id:
+            history = list(self._history.get(video_id, ()))
+            ids = [e["id"] for e in history]
+            if last_event_id in ids:
+                backlog = history[ids.index(last_event_id) + 1:]
+            else:
+                reset = True
+        return subscriber, backlog, reset
+
+    def unsubscribe(self, video_id: str, subscriber: CommentSubscriber):
+        subscribers = self._subscribers.get(video_id)
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[video_id]
+
+    def deliver(self, video_id: str, event: dict):
+        history = self._history.setdefault(video_id, deque(maxlen=COMMENT_HISTORY_SIZE))
+        history.append(event)
+        self._history.move_to_end(video_id)
+        self._evict_history()
+        for subscriber in list(self._subscribers.get(video_id, ())):
+            try:
+                subscriber.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                subscriber.lagged = True
+                self.unsubscribe(video_id, subscriber)
+
+    def reset_all(self):
+        """Forget all history and tell every subscriber to refetch, for when events may have been missed."""
+        self._history.clear()
+        for video_id, subscribers in list(self._subscribers.items()):
+            for subscriber in list(subscribers):
+                try:
+                    subscriber.queue.put_nowait({"id": None, "type": "reset", "data": {}})
+                except asyncio.QueueFull:
+                    subscriber.lagged = True
+                    self.unsubscribe(video_id, subscriber)
+
+    def _evict_history(self):
+        # Prefer dropping videos nobody is watching; their next reconnect just gets a reset
+        while len(self._history) > COMMENT_HISTORY_VIDEOS:
+            victim = next((v for v in self._history if v not in self._subscribers), None)
+            if victim is None:
+                return
+            del self._history[victim]
+
+    async def publish(self, video_id: str, event_type: str, data: dict):
+        self._seq += 1
+        self.deliver(video_id, {"id": f"{self._epoch}-{self._seq}", "type": event_type, "data": data})
+
+    async def run(self):
+        pass
+
+# Server errors meaning a change stream cannot resume from the given token:
+# InvalidResumeToken, ChangeStreamFatalError, ChangeStreamHistoryLost
+CHANGE_STREAM_RESUME_FAILED = {260, 280, 286}
+
+class ChangeStreamCommentBroadcaster(CommentBroadcaster):
+    """Multi-worker fan-out: events go through a comment_events collection and
+    every worker tails it with a change stream (requires a replica set).
+
+    After a failure the stream reopens from the last event seen, so nothing
+    inserted in between is lost; if the oplog no longer covers that point,
+    subscribers get a reset and refetch instead.
+    """
+    async def publish(self, video_id: str, event_type: str, data: dict):
+        await db.comment_events.insert_one({
+            "video_id": video_id,
+            "type": event_type,
+            "data": data,
+            "created_at": datetime.now(timezone.utc)
+        })
+
+    async def run(self):
+        pipeline = [{"$match": {"operationType": "insert"}}]
+        resume_token = None
+        while True:
+            try:
+                async with db.comment_events.watch(pipeline, resume_after=resume_token) as stream:
+                    async for change in stream:
+                        doc = change["fullDocument"]
+                        self.deliver(doc["video_id"], {"id": str(doc["_id"]), "type": doc["type"], "data": doc["data"]})
+                        resume_token = change["_id"]
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                if resume_token is not None and e.code in CHANGE_STREAM_RESUME_FAILED:
+                    logger.warning(f"Comment change stream cannot resume, resetting subscribers: {e}")
+                    resume_token = None
+                    self.reset_all()
+                    continue
+                logger.error(f"Comment change stream failed, restarting: {e}")
+                await asyncio.sleep(COMMENT_STREAM_RETRY_DELAY)
+            except Exception as e:
+                logger.error(f"Comment change stream failed, restarting: {e}")
+                await asyncio.sleep(COMMENT_STREAM_RETRY_DELAY)
+
+if os.environ.get('COMMENT_BROADCASTER', 'memory') == 'changestream':
+    comment_broadcaster = ChangeStreamCommentBroadcaster()
+else:
+    comment_broadcaster = CommentBroadcaster()
+
+def format_sse(event: dict) -> str:
+    data = f"event: {event['type']}\ndata: {json.dumps(event['data'], ensure_ascii=False)}\n\n"
+    # Resets carry no id so the client's Last-Event-ID stays at its last real event
+    return f"id: {event['id']}\n{data}" if event.get("id") else data
+
+@api_router.get("/comments/{video_id}/stream")
+async def stream_comments(video_id: str, request: Request, last_event_id: Optional[str] = None):
+    # EventSource sends Last-Event-ID itself on reconnect; the query param covers the first connect
+    last_event_id = request.headers.get("last-event-id") or last_event_id
+    
+    async def events():
+        subscriber, backlog, reset = comment_broadcaster.subscribe(video_id, last_event_id)
+        try:
+            yield "retry: 3000\n\n"
+            if reset:
+                # Gap is older than our history: tell the client to refetch the list once
+                yield "event: reset\ndata: {}\n\n"
+            for event in backlog:
+                yield format_sse(event)
+            while True:
+                if subscriber.lagged and subscriber.queue.empty():
+                    break
+                if await request.is_disconnected():
+                    break
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), timeout=COMMENT_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_sse(event)
+        finally:
+            comment_broadcaster.unsubscribe(video_id, subscriber)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # ===== COMMENTS =====
 @api_router.get("/comments/{video_id}")
 async def get_comments(video_id: str):
@@ -368,6 +776,8 @@ async def create_comment(data: CommentCreate, user=Depends(get_current_user)):
             {"$addToSet": {"replies": comment.id}}
         )
     
+    await comment_broadcaster.publish(comment.video_id, "comment_created", comment.model_dump())
+    track_analytics("comments", comment.video_id)
     return comment
 
 @api_router.delete("/comments/{comment_id}")
@@ -379,6 +789,7 @@ async def delete_comment(comment_id: str, user=Depends(get_current_user)):
         raise HTTPException(status_code=403, detail="Not authorized")
     
     await db.comments.delete_one({"id": comment_id})
+    await comment_broadcaster.publish(comment["video_id"], "comment_deleted", {"id": comment_id})
     return {"success": True}
 
 # ===== USER ACTIONS =====
@@ -410,9 +821,130 @@ async def get_liked_videos(user=Depends(get_current_user)):
     videos = await db.videos.find({"id": {"$in": video_ids}}, {"_id": 0}).to_list(100)
     return videos
 
+# ===== WATCH PROGRESS =====
+# Players send a heartbeat every few seconds; writing each one straight to Mongo
+# would dwarf all other write traffic, so heartbeats are coalesced in memory per
+# (user, video) and only the latest position is flushed in periodic bulk upserts.
+WATCH_PROGRESS_FLUSH_INTERVAL = float(os.environ.get('WATCH_PROGRESS_FLUSH_INTERVAL', '10'))
+WATCH_PROGRESS_COMPLETE_RATIO = 0.95
+
+class WatchProgressBuffer:
+    def __init__(self):
+        self._pending: Dict[tuple, dict] = {}
+        self._lock = asyncio.Lock()
+
+    def record(self, user_id: str, video_id: str, position: float, duration: Optional[float]):
+        completed = bool(duration) and position >= duration * WATCH_PROGRESS_COMPLETE_RATIO
+        self._pending[(user_id, video_id)] = {
+            "user_id": user_id,
+            "video_id": video_id,
+            "position": position,
+            "duration": duration,
+            "completed": completed,
+            "updated_at": datetime.now(timezone.utc).isoformat()
+        }
+
+    async def remove(self, user_id: str, video_id: str):
+        # Under the lock so a flush already in progress can't re-upsert the row afterwards
+        async with self._lock:
+            self._pending.pop((user_id, video_id), None)
+            await db.watch_progress.delete_one({"user_id": user_id, "video_id": video_id})
+
+    async def flush(self, user_id: Optional[str] = None):
+        async with self._lock:
+            if user_id is None:
+                entries = list(self._pending.values())
+                self._pending = {}
+            else:
+                keys = [k for k in self._pending if k[0] == user_id]
+                entries = [self._pending.pop(k) for k in keys]
+            if not entries:
+                return 0
+            ops = [
+                UpdateOne(
+                    {"user_id": e["user_id"], "video_id": e["video_id"]},
+                    {"$set": e},
+                    upsert=True
+                )
+                for e in entries
+            ]
+            try:
+                await db.watch_progress.bulk_write(ops, ordered=False)
+            except BaseException:
+                # Put entries back unless a newer heartbeat arrived meanwhile; this
+                # includes cancellation at shutdown so the final flush still sees them
+                for e in entries:
+                    self._pending.setdefault((e["user_id"], e["video_id"]), e)
+                raise
+            return len(entries)
+
+watch_progress_buffer = WatchProgressBuffer()
+
+async def watch_progress_flush_loop():
+    while True:
+        await asyncio.sleep(WATCH_PROGRESS_FLUSH_INTERVAL)
+        try:
+            await watch_progress_buffer.flush()
+        except Exception as e:
+            logger.error(f"Watch progress flush failed: {e}")
+
+async def video_exists(video_id: str) -> bool:
+    # Heartbeats arrive every few seconds, so remember known ids briefly;
+    # admin video writes clear the "videos:" prefix
+    cache_key = f"videos:exists:{video_id}"
+    if read_cache.get(cache_key):
+        return True
+    if await db.videos.find_one({"id": video_id}, {"_id": 1}):
+        read_cache.set(cache_key, True)
+        return True
+    return False
+
+@api_router.post("/user/watch-progress/{video_id}")
+async def update_watch_progress(video_id: str, data: WatchProgressUpdate, user=Depends(get_current_user)):
+    if not await video_exists(video_id):
+        raise HTTPException(status_code=404, detail="Video not found")
+    watch_progress_buffer.record(user["username"], video_id, data.position, data.duration)
+    return {"success": True}
+
+@api_router.get("/user/continue-watching")
+async def get_continue_watching(
+    limit: int = Query(20, ge=1, le=100),
+    before: Optional[str] = None,
+    user=Depends(get_current_user)
+):
+    # Make this user's own latest heartbeats visible before reading
+    await watch_progress_buffer.flush(user["username"])
+    
+    query = {"user_id": user["username"], "completed": False}
+    if before:
+        query["updated_at"] = {"$lt": before}
+    entries = await db.watch_progress.find(query, {"_id": 0}).sort("updated_at", -1).to_list(limit)
+    
+    video_ids = [e["video_id"] for e in entries]
+    videos = await db.videos.find({"id": {"$in": video_ids}}, {"_id": 0}).to_list(len(video_ids))
+    videos_by_id = {v["id"]: v for v in videos}
+    
+    items = []
+    for entry in entries:
+        video = videos_by_id.get(entry["video_id"])
+        if video:
+            items.append({**entry, "video": video})
+    
+    next_cursor = entries[-1]["updated_at"] if len(entries) == limit else None
+    return {"items": items, "next_cursor": next_cursor}
+
+@api_router.delete("/user/continue-watching/{video_id}")
+async def remove_continue_watching(video_id: str, user=Depends(get_current_user)):
+    await watch_progress_buffer.remove(user["username"], video_id)
+    return {"success": True}
+
 # ===== CATEGORIES =====
 @api_router.get("/categories")
 async def get_categories():
+    cached = read_cache.get("categories")
+    if cached is not None:
+        return cached
+    
     categories = await db.categories.find({}, {"_id": 0}).to_list(100)
     # Update video count for each category
     for category in categories:
@@ -423,22 +955,31 @@ async def get_categories():
             ]
         })
         category["video_count"] = count
-    return categories
+    return read_cache.set("categories", categories)
 
 # ===== SETTINGS =====
 @api_router.get("/settings")
 async def get_settings():
+    cached = read_cache.get("settings")
+    if cached is not None:
+        return cached
+    
     settings = await db.settings.find_one({}, {"_id": 0})
     if not settings:
         settings = Settings().model_dump()
         await db.settings.insert_one(settings)
-    return settings
+        settings.pop("_id", None)
+    return read_cache.set("settings", settings)
 
 # ===== PAGES =====
 @api_router.get("/pages")
 async def get_pages():
+    cached = read_cache.get("pages")
+    if cached is not None:
+        return cached
+    
     pages = await db.pages.find({}, {"_id": 0}).to_list(100)
-    return pages
+    return read_cache.set("pages", pages)
 
 @api_router.get("/pages/{page_name}")
 async def get_page(page_name: str):
@@ -523,13 +1064,367 @@ async def delete_playlist(playlist_id: str, user=Depends(get_current_user)):
 # ===== ADS =====
 @api_router.get("/ads")
 async def get_ads(position: Optional[str] = None):
+    cache_key = f"ads:{position or ''}"
+    cached = read_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
     query = {"enabled": True}
     if position:
         query["position"] = position
     ads = await db.ads.find(query, {"_id": 0}).to_list(100)
-    return ads
+    return read_cache.set(cache_key, ads)
+
+# ===== IMAGE PROXY =====
+# Thumbnails, ad banners and the logo point at arbitrary external hosts and are
+# often full-size originals. This proxy fetches them once through a pooled
+# client, resizes/transcodes to the requested width and keeps the result in a
+# bounded on-disk LRU cache keyed by (url, width, format).
+#
+# The URL comes from the caller, so by default only hosts the site itself uses
+# are proxied: IMAGE_ALLOWED_HOSTS plus every host appearing in admin-managed
+# thumbnail, banner and logo URLs. Every connection (including redirect hops)
+# must also be to a public address on a standard port; the address is vetted
+# and dialled in one step so DNS rebinding can't swap in an internal one.
+IMAGE_CACHE_DIR = Path(os.environ.get('IMAGE_CACHE_DIR', ROOT_DIR / 'image_cache'))
+IMAGE_CACHE_MAX_BYTES = int(os.environ.get('IMAGE_CACHE_MAX_BYTES', str(256 * 1024 * 1024)))
+# Comma-separated extra hosts; "*" opens the proxy to any public host
+IMAGE_ALLOWED_HOSTS = {
+    h.strip().lower() for h in os.environ.get('IMAGE_ALLOWED_HOSTS', 'api.dicebear.com').split(',') if h.strip()
+}
+# (collection, field) pairs whose URLs admins manage and the proxy should serve
+IMAGE_URL_FIELDS = [
+    ("videos", "thumbnail_url"),
+    ("categories", "thumbnail_url"),
+    ("ads", "image_url"),
+    ("settings", "logo_url"),
+]
+IMAGE_ALLOWED_PORTS = {80, 443}
+IMAGE_MAX_REDIRECTS = 5
+IMAGE_MAX_SOURCE_BYTES = 10 * 1024 * 1024
+IMAGE_MAX_WIDTH = 1920
+# Refuse to decode anything larger (about 6000x4000); checked from the header before decoding
+IMAGE_MAX_PIXELS = 24_000_000
+IMAGE_FORMATS = {
+    "webp": ("WEBP", "image/webp"),
+    "jpeg": ("JPEG", "image/jpeg"),
+    "png": ("PNG", "image/png"),
+}
+IMAGE_CACHE_HEADERS = {
+    "Cache-Control": "public, max-age=31536000, immutable",
+    "X-Content-Type-Options": "nosniff",
+}
+# SVGs are passed through, so make sure any script inside can never run on our origin
+SVG_HEADERS = {
+    **IMAGE_CACHE_HEADERS,
+    "Content-Security-Policy": "default-src 'none'; style-src 'unsafe-inline'; sandbox",
+    "Content-Disposition": "attachment",
+}
+
+class ImageFetchError(Exception):
+    """Any failure to fetch an upstream image; details are logged, never returned."""
+
+def is_public_address(address: str) -> bool:
+    ip = ipaddress.ip_address(address)
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+async def lookup_host(host: str, port: int) -> List[str]:
+    infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    return [info[4][0] for info in infos]
+
+async def resolve_public_address(host: str, port: int) -> str:
+    """Resolve host once and return an address to dial, refusing hosts with any non-public address."""
+    try:
+        addresses = await lookup_host(host, port)
+    except OSError as e:
+        raise ImageFetchError(f"Cannot resolve {host}: {e}")
+    if not addresses or not all(is_public_address(a) for a in addresses):
+        raise ImageFetchError(f"Host {host} resolves to a non-public address")
+    return addresses[0]
+
+class PublicOnlyNetworkBackend(httpcore.AsyncNetworkBackend):
+    """Dials exactly the address it vetted, so there is no second DNS lookup to rebind.
+
+    TLS still uses the URL's hostname for SNI and certificate checks, and the
+    Host header is untouched, since httpcore only hands the backend host/port.
+    """
+    def __init__(self):
+        self._backend = httpcore.AnyIOBackend()
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        address = await resolve_public_address(host, port)
+        return await self._backend.connect_tcp(
+            address, port, timeout=timeout, local_address=local_address, socket_options=socket_options
+        )
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        raise ImageFetchError("Unix sockets are not allowed")
+
+    async def sleep(self, seconds):
+        await self._backend.sleep(seconds)
+
+class PublicOnlyTransport(httpx.AsyncHTTPTransport):
+    def __init__(self, limits: httpx.Limits):
+        super().__init__(limits=limits)
+        # httpx has no public hook for the network backend, so replace its pool
+        self._pool = httpcore.AsyncConnectionPool(
+            ssl_context=httpx.create_ssl_context(),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            network_backend=PublicOnlyNetworkBackend()
+        )
+
+def make_image_http_client() -> httpx.AsyncClient:
+    limits = httpx.Limits(max_connections=50, max_keepalive_connections=20)
+    return httpx.AsyncClient(
+        timeout=15.0,
+        follow_redirects=False,
+        trust_env=False,
+        transport=PublicOnlyTransport(limits)
+    )
+
+image_http_client = make_image_http_client()
+
+class ImageCache:
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total = 0
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    def _scan(self) -> List[tuple]:
+        """(name, size) of every cached file on disk, oldest access first."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        found = []
+        for f in self.directory.iterdir():
+            if f.name.endswith(".tmp"):
+                continue
+            try:
+                stat = f.stat()
+            except FileNotFoundError:
+                continue
+            if f.is_file():
+                found.append((stat.st_mtime, f.name, stat.st_size))
+        return [(name, size) for _, name, size in sorted(found)]
+
+    async def load(self):
+        """Index files left over from a previous run, oldest access first.
+
+        The directory is scanned in a thread but the index is only touched here
+        on the event loop, and it is rebuilt rather than appended to, so calling
+        this again (e.g. on a warm-up retry) never double-counts.
+        """
+        scanned = await asyncio.to_thread(self._scan)
+        entries: "OrderedDict[str, int]" = OrderedDict(scanned)
+        # Entries cached while the scan ran are the most recently used
+        for name, size in self._entries.items():
+            entries.pop(name, None)
+            entries[name] = size
+        self._entries = entries
+        self._total = sum(entries.values())
+        evicted = self._evict()
+        if evicted:
+            await asyncio.to_thread(lambda: [p.unlink(missing_ok=True) for p in evicted])
+
+    def path_for(self, name: str) -> Path:
+        return self.directory / name
+
+    def get(self, name: str) -> Optional[Path]:
+        if name not in self._entries:
+            return None
+        path = self.path_for(name)
+        if not path.exists():
+            self._total -= self._entries.pop(name)
+            return None
+        self._entries.move_to_end(name)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return path
+
+    def _write(self, name: str, data: bytes) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(name)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        return path
+
+    async def put(self, name: str, data: bytes) -> Path:
+        path = await asyncio.to_thread(self._write, name, data)
+        if name in self._entries:
+            self._total -= self._entries.pop(name)
+        self._entries[name] = len(data)
+        self._total += len(data)
+        evicted = self._evict()
+        if evicted:
+            await asyncio.to_thread(lambda: [p.unlink(missing_ok=True) for p in evicted])
+        return path
+
+    def _evict(self) -> List[Path]:
+        """Drop least recently used entries from the index; returns the files to delete."""
+        evicted = []
+        while self._total > self.max_bytes and len(self._entries) > 1:
+            name, size = self._entries.popitem(last=False)
+            self._total -= size
+            evicted.append(self.path_for(name))
+        return evicted
+
+    async def _produce(self, name: str, producer) -> Path:
+        return await self.put(name, await producer())
+
+    def _finished(self, name: str, task: asyncio.Task):
+        self._inflight.pop(name, None)
+        # Retrieve the outcome so a failure nobody awaited is not logged as unhandled
+        if not task.cancelled():
+            task.exception()
+
+    async def get_or_create(self, name: str, producer):
+        """Return the cached path for name, running producer at most once for concurrent callers.
+
+        The producer runs in its own task, so a caller that disconnects never
+        cancels the fetch other callers are waiting on.
+        """
+        path = self.get(name)
+        if path:
+            return path
+        task = self._inflight.get(name)
+        if task is None:
+            task = asyncio.create_task(self._produce(name, producer))
+            self._inflight[name] = task
+            task.add_done_callback(lambda t: self._finished(name, t))
+        return await asyncio.shield(task)
+
+image_cache = ImageCache(IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_BYTES)
+
+def transcode_image(data: bytes, width: int, fmt: str) -> bytes:
+    pil_format = IMAGE_FORMATS[fmt][0]
+    with Image.open(io.BytesIO(data)) as img:
+        # Image.open only parses the header, so this runs before any pixels are decoded
+        if img.width * img.height > IMAGE_MAX_PIXELS:
+            raise ImageFetchError(f"Image is {img.width}x{img.height}, over the {IMAGE_MAX_PIXELS} pixel limit")
+        img.seek(0)
+        if img.width > width:
+            height = max(1, round(img.height * width / img.width))
+            # JPEGs decode straight at 1/2, 1/4 or 1/8 scale instead of full size
+            img.draft(None, (width, height))
+            img = img.resize((width, height), Image.LANCZOS)
+        if pil_format == "JPEG":
+            img = img.convert("RGB")
+        elif img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA")
+        out = io.BytesIO()
+        img.save(out, pil_format, quality=82, optimize=True)
+        return out.getvalue()
+
+def is_svg(data: bytes) -> bool:
+    head = data[:512].lstrip().lower()
+    return head.startswith(b"<svg") or (head.startswith(b"<?xml") and b"<svg" in head)
+
+def read_file_head(path: Path, size: int = 512) -> bytes:
+    with open(path, "rb") as f:
+        return f.read(size)
+
+async def image_content_hosts() -> set:
+    """Hosts of every admin-managed image URL, cached briefly in the read cache."""
+    cached = read_cache.get("image-hosts")
+    if cached is not None:
+        return cached
+    hosts = set()
+    for collection, field in IMAGE_URL_FIELDS:
+        pipeline = [
+            {"$match": {field: {"$type": "string", "$ne": ""}}},
+            {"$project": {"m": {"$regexFind": {"input": f"${field}", "regex": r"^https?://([^/:?#@]+)", "options": "i"}}}},
+            {"$match": {"m": {"$ne": None}}},
+            {"$group": {"_id": {"$toLower": {"$arrayElemAt": ["$m.captures", 0]}}}}
+        ]
+        async for row in db[collection].aggregate(pipeline):
+            hosts.add(row["_id"])
+    return read_cache.set("image-hosts", hosts)
+
+async def check_image_url(url: str):
+    """Raise ImageFetchError unless url is plain http(s) on a standard port to an allowed host."""
+    try:
+        parsed = httpx.URL(url)
+    except Exception:
+        raise ImageFetchError(f"Malformed URL {url!r}")
+    if parsed.scheme not in ("http", "https") or not parsed.host or parsed.userinfo:
+        raise ImageFetchError(f"Unsupported URL {url!r}")
+    port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    if port not in IMAGE_ALLOWED_PORTS:
+        raise ImageFetchError(f"Port {port} not allowed")
+    host = parsed.raw_host.decode("ascii").lower()
+    if "*" not in IMAGE_ALLOWED_HOSTS and host not in IMAGE_ALLOWED_HOSTS and host not in await image_content_hosts():
+        raise ImageFetchError(f"Host {host} is not an allowed image host")
+
+async def fetch_image_source(url: str) -> bytes:
+    # Redirects are followed by hand so each hop goes through check_image_url;
+    # the public-address check happens when the transport connects
+    for _ in range(IMAGE_MAX_REDIRECTS + 1):
+        await check_image_url(url)
+        try:
+            async with image_http_client.stream("GET", url) as response:
+                if response.is_redirect:
+                    url = str(response.url.join(response.headers["location"]))
+                    continue
+                if response.status_code != 200:
+                    raise ImageFetchError(f"Upstream returned {response.status_code}")
+                chunks = []
+                size = 0
+                async for chunk in response.aiter_bytes():
+                    size += len(chunk)
+                    if size > IMAGE_MAX_SOURCE_BYTES:
+                        raise ImageFetchError("Upstream image too large")
+                    chunks.append(chunk)
+                return b"".join(chunks)
+        except httpx.HTTPError as e:
+            raise ImageFetchError(f"Fetching {url} failed: {e}")
+    raise ImageFetchError("Too many redirects")
+
+@api_router.get("/image")
+async def proxy_image(
+    url: str,
+    w: int = Query(480, ge=16, le=IMAGE_MAX_WIDTH),
+    format: str = "webp"
+):
+    if format not in IMAGE_FORMATS:
+        raise HTTPException(status_code=400, detail="Format must be webp, jpeg or png")
+    
+    digest = hashlib.sha256(f"{url}|{w}|{format}".encode()).hexdigest()
+    name = f"{digest}.{format}"
+    
+    async def produce():
+        data = await fetch_image_source(url)
+        try:
+            return await asyncio.to_thread(transcode_image, data, w, format)
+        except UnidentifiedImageError:
+            # Vector images (e.g. the seeded dicebear SVGs) are cached untouched
+            if is_svg(data):
+                return data
+            raise ImageFetchError("Upstream did not return an image")
+        except (OSError, ValueError, Image.DecompressionBombError) as e:
+            # Truncated or corrupt files and decompression bombs
+            raise ImageFetchError(f"Could not decode image: {e}")
+    
+    try:
+        path = await image_cache.get_or_create(name, produce)
+    except ImageFetchError as e:
+        # One generic answer for every failure so the proxy cannot be used to probe hosts
+        logger.warning(f"Image proxy refused {url}: {e}")
+        raise HTTPException(status_code=502, detail="Image could not be fetched")
+    
+    if is_svg(await asyncio.to_thread(read_file_head, path)):
+        return FileResponse(path, media_type="image/svg+xml", headers=SVG_HEADERS)
+    return FileResponse(path, media_type=IMAGE_FORMATS[format][1], headers=IMAGE_CACHE_HEADERS)
 
 # ===== TRANSLATION =====
+translate_http_client = httpx.AsyncClient(timeout=30.0)
+
 class TranslateRequest(BaseModel):
     text: str
     target_lang: str
@@ -559,60 +1454,59 @@ async def translate_text(data: TranslateRequest):
         )
     
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            # LibreTranslate API endpoint
-            url = f"{LIBRETRANSLATE_API_URL}/translate"
-            
-            # Detect language if source is auto
-            source_lang = data.source_lang
-            if source_lang == "auto":
-                detect_payload = {
-                    "q": data.text,
-                    "api_key": LIBRETRANSLATE_API_KEY
-                }
-                    
-                try:
-                    detect_response = await client.post(
-                        f"{LIBRETRANSLATE_API_URL}/detect",
-                        json=detect_payload
-                    )
-                    
-                    if detect_response.status_code == 200:
-                        detect_data = detect_response.json()
-                        if detect_data and len(detect_data) > 0:
-                            source_lang = detect_data[0]["language"]
-                        else:
-                            source_lang = "en"
-                    else:
-                        source_lang = "en"
-                except:
-                    source_lang = "en"
-            
-            # Translate text
-            payload = {
+        # LibreTranslate API endpoint
+        url = f"{LIBRETRANSLATE_API_URL}/translate"
+        
+        # Detect language if source is auto
+        source_lang = data.source_lang
+        if source_lang == "auto":
+            detect_payload = {
                 "q": data.text,
-                "source": source_lang,
-                "target": data.target_lang,
-                "format": "text",
                 "api_key": LIBRETRANSLATE_API_KEY
             }
-            
-            response = await client.post(url, json=payload)
-            response.raise_for_status()
-            result = response.json()
-            
-            # Check for errors in response
-            if "error" in result:
-                raise HTTPException(
-                    status_code=503,
-                    detail=f"LibreTranslate API error: {result['error']}"
+                
+            try:
+                detect_response = await translate_http_client.post(
+                    f"{LIBRETRANSLATE_API_URL}/detect",
+                    json=detect_payload
                 )
-            
-            return {
-                "translated_text": result.get("translatedText", data.text),
-                "source_lang": source_lang,
-                "target_lang": data.target_lang
-            }
+                
+                if detect_response.status_code == 200:
+                    detect_data = detect_response.json()
+                    if detect_data and len(detect_data) > 0:
+                        source_lang = detect_data[0]["language"]
+                    else:
+                        source_lang = "en"
+                else:
+                    source_lang = "en"
+            except:
+                source_lang = "en"
+        
+        # Translate text
+        payload = {
+            "q": data.text,
+            "source": source_lang,
+            "target": data.target_lang,
+            "format": "text",
+            "api_key": LIBRETRANSLATE_API_KEY
+        }
+        
+        response = await translate_http_client.post(url, json=payload)
+        response.raise_for_status()
+        result = response.json()
+        
+        # Check for errors in response
+        if "error" in result:
+            raise HTTPException(
+                status_code=503,
+                detail=f"LibreTranslate API error: {result['error']}"
+            )
+        
+        return {
+            "translated_text": result.get("translatedText", data.text),
+            "source_lang": source_lang,
+            "target_lang": data.target_lang
+        }
     except HTTPException:
         raise
     except httpx.HTTPError as e:
@@ -635,22 +1529,37 @@ async def admin_login(data: AdminLogin):
 async def admin_create_video(video: VideoCreate, admin=Depends(get_admin)):
     new_video = Video(**video.model_dump())
     await db.videos.insert_one(new_video.model_dump())
+    await rebuild_episode_index(new_video.category.model_dump())
+    read_cache.invalidate("videos:", "categories")
     return new_video
 
 @api_router.put("/admin/videos/{video_id}")
 async def admin_update_video(video_id: str, video: VideoCreate, admin=Depends(get_admin)):
+    old_video = await db.videos.find_one({"id": video_id}, {"_id": 0, "category": 1})
     await db.videos.update_one({"id": video_id}, {"$set": video.model_dump()})
+    
+    # Re-index the old category too in case the video moved
+    if old_video and category_key(old_video["category"]) != category_key(video.category.model_dump()):
+        await rebuild_episode_index(old_video["category"])
+    await rebuild_episode_index(video.category.model_dump())
+    read_cache.invalidate("videos:", "categories")
     return {"success": True}
 
 @api_router.delete("/admin/videos/{video_id}")
 async def admin_delete_video(video_id: str, admin=Depends(get_admin)):
+    video = await db.videos.find_one({"id": video_id}, {"_id": 0, "category": 1})
     await db.videos.delete_one({"id": video_id})
-    await db.comments.delete_many({"video_id": video_id})
+    if video:
+        await rebuild_episode_index(video["category"])
+    read_cache.invalidate("videos:", "categories")
+    # Comments and references in users/playlists are removed in the background
+    await enqueue_cleanup("video_deleted", video_id)
     return {"success": True}
 
 @api_router.put("/admin/settings")
 async def admin_update_settings(settings: Settings, admin=Depends(get_admin)):
     await db.settings.update_one({}, {"$set": settings.model_dump()}, upsert=True)
+    read_cache.invalidate("settings")
     return {"success": True}
 
 @api_router.get("/admin/categories")
@@ -662,31 +1571,37 @@ async def admin_get_categories(admin=Depends(get_admin)):
 async def admin_create_category(category: Category, admin=Depends(get_admin)):
     new_category = Category(**category.model_dump())
     await db.categories.insert_one(new_category.model_dump())
+    read_cache.invalidate("categories")
     return new_category
 
 @api_router.put("/admin/categories/{category_id}")
 async def admin_update_category(category_id: str, category: Category, admin=Depends(get_admin)):
     await db.categories.update_one({"id": category_id}, {"$set": category.model_dump()})
+    read_cache.invalidate("categories")
     return {"success": True}
 
 @api_router.delete("/admin/categories/{category_id}")
 async def admin_delete_category(category_id: str, admin=Depends(get_admin)):
     await db.categories.delete_one({"id": category_id})
+    read_cache.invalidate("categories")
     return {"success": True}
 
 @api_router.post("/admin/pages")
 async def admin_create_page(page: Page, admin=Depends(get_admin)):
     await db.pages.insert_one(page.model_dump())
+    read_cache.invalidate("pages")
     return page
 
 @api_router.put("/admin/pages/{page_name}")
 async def admin_update_page(page_name: str, page: Page, admin=Depends(get_admin)):
     await db.pages.update_one({"page_name": page_name}, {"$set": page.model_dump()}, upsert=True)
+    read_cache.invalidate("pages")
     return {"success": True}
 
 @api_router.delete("/admin/pages/{page_name}")
 async def admin_delete_page(page_name: str, admin=Depends(get_admin)):
     await db.pages.delete_one({"page_name": page_name})
+    read_cache.invalidate("pages")
     return {"success": True}
 
 @api_router.get("/admin/playlists")
@@ -708,16 +1623,19 @@ async def admin_get_ads(admin=Depends(get_admin)):
 async def admin_create_ad(ad: AdBanner, admin=Depends(get_admin)):
     new_ad = AdBanner(**ad.model_dump())
     await db.ads.insert_one(new_ad.model_dump())
+    read_cache.invalidate("ads:")
     return new_ad
 
 @api_router.put("/admin/ads/{ad_id}")
 async def admin_update_ad(ad_id: str, ad: AdBanner, admin=Depends(get_admin)):
     await db.ads.update_one({"id": ad_id}, {"$set": ad.model_dump()})
+    read_cache.invalidate("ads:")
     return {"success": True}
 
 @api_router.delete("/admin/ads/{ad_id}")
 async def admin_delete_ad(ad_id: str, admin=Depends(get_admin)):
     await db.ads.delete_one({"id": ad_id})
+    read_cache.invalidate("ads:")
     return {"success": True}
 
 @api_router.get("/admin/users")
@@ -732,11 +1650,399 @@ async def admin_delete_user(username: str, admin=Depends(get_admin)):
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Delete user's comments
-    await db.comments.delete_many({"user_id": username})
+    # Comments, playlists and watch progress are removed in the background
+    await enqueue_cleanup("user_deleted", username)
     
     return {"success": True}
 
+# ===== REFERENCE CLEANUP =====
+# Deleting a video or user leaves its id behind in other documents (watch_later,
+# liked_videos, playlist video_ids, comments, playlists). Admin deletes only
+# enqueue a persisted job; a background worker removes the references in
+# chunked batches, so the work survives restarts and deletes return at once.
+# A periodic sweep enqueues jobs for any dangling video ids that slipped through;
+# a lease document in cleanup_jobs makes sure only one worker runs it per interval.
+CLEANUP_BATCH_SIZE = 500
+CLEANUP_POLL_INTERVAL = 30.0
+CLEANUP_SWEEP_INTERVAL = float(os.environ.get('CLEANUP_SWEEP_INTERVAL', '3600'))
+CLEANUP_LEASE = timedelta(minutes=5)
+CLEANUP_MAX_ATTEMPTS = 5
+# Finished (done/skipped) jobs are removed by a TTL index after this long
+CLEANUP_JOB_RETENTION = timedelta(days=int(os.environ.get('CLEANUP_JOB_RETENTION_DAYS', '7')))
+CLEANUP_SWEEP_LEASE_ID = "reconcile-sweep"
+# (collection, field) pairs that hold video ids, single values or arrays
+VIDEO_REFERENCE_FIELDS = [
+    ("users", "watch_later"),
+    ("users", "liked_videos"),
+    ("playlists", "video_ids"),
+    ("comments", "video_id"),
+]
+
+cleanup_wakeup = asyncio.Event()
+
+async def enqueue_cleanup(job_type: str, target: str):
+    """Queue a cleanup job unless an identical one is already pending or running."""
+    now = datetime.now(timezone.utc)
+    await db.cleanup_jobs.update_one(
+        {"type": job_type, "target": target, "status": {"$in": ["pending", "running"]}},
+        {"$setOnInsert": {
+            "id": str(uuid.uuid4()),
+            "type": job_type,
+            "target": target,
+            "status": "pending",
+            "attempts": 0,
+            "lease_until": now,
+            "error": None,
+            "created_at": now.isoformat(),
+            "updated_at": now.isoformat()
+        }},
+        upsert=True
+    )
+    cleanup_wakeup.set()
+
+async def update_in_batches(collection: str, query: dict, update: dict):
+    # The update must make documents stop matching query, otherwise this never ends
+    while True:
+        ids = [d["_id"] async for d in db[collection].find(query, {"_id": 1}).limit(CLEANUP_BATCH_SIZE)]
+        if not ids:
+            return
+        await db[collection].update_many({"_id": {"$in": ids}}, update)
+
+async def delete_in_batches(collection: str, query: dict):
+    while True:
+        ids = [d["_id"] async for d in db[collection].find(query, {"_id": 1}).limit(CLEANUP_BATCH_SIZE)]
+        if not ids:
+            return
+        await db[collection].delete_many({"_id": {"$in": ids}})
+
+async def cleanup_deleted_video(video_id: str) -> Optional[str]:
+    # An import may have restored the video since the job was queued
+    if await db.videos.find_one({"id": video_id}, {"_id": 1}):
+        return "video exists again"
+    await delete_in_batches("comments", {"video_id": video_id})
+    await update_in_batches("users", {"watch_later": video_id}, {"$pull": {"watch_later": video_id}})
+    await update_in_batches("users", {"liked_videos": video_id}, {"$pull": {"liked_videos": video_id}})
+    await update_in_batches("playlists", {"video_ids": video_id}, {"$pull": {"video_ids": video_id}})
+    await delete_in_batches("watch_progress", {"video_id": video_id})
+    return None
+
+async def cleanup_deleted_user(username: str) -> Optional[str]:
+    # Data is keyed by username, so if someone re-registered it the rows are theirs now
+    if await db.users.find_one({"username": username}, {"_id": 1}):
+        return "username registered again"
+    await delete_in_batches("comments", {"user_id": username})
+    await delete_in_batches("playlists", {"user_id": username})
+    await delete_in_batches("watch_progress", {"user_id": username})
+    return None
+
+CLEANUP_HANDLERS = {
+    "video_deleted": cleanup_deleted_video,
+    "user_deleted": cleanup_deleted_user,
+}
+
+async def claim_cleanup_job() -> Optional[dict]:
+    # Running jobs whose lease ran out belong to a worker that died mid-job
+    now = datetime.now(timezone.utc)
+    return await db.cleanup_jobs.find_one_and_update(
+        {"status": {"$in": ["pending", "running"]}, "lease_until": {"$lte": now}},
+        {
+            "$set": {"status": "running", "lease_until": now + CLEANUP_LEASE, "updated_at": now.isoformat()},
+            "$inc": {"attempts": 1}
+        },
+        sort=[("created_at", 1)],
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
+
+async def run_cleanup_job(job: dict):
+    try:
+        skipped = await CLEANUP_HANDLERS[job["type"]](job["target"])
+        if skipped:
+            logger.info(f"Cleanup job {job['id']} ({job['type']} {job['target']}) skipped: {skipped}")
+            update = {"status": "skipped", "error": None, "note": skipped}
+        else:
+            update = {"status": "done", "error": None}
+        update["finished_at"] = datetime.now(timezone.utc)
+    except Exception as e:
+        logger.error(f"Cleanup job {job['id']} ({job['type']} {job['target']}) failed: {e}")
+        failed = job["attempts"] >= CLEANUP_MAX_ATTEMPTS
+        update = {"status": "failed" if failed else "pending", "error": str(e)}
+    update["updated_at"] = datetime.now(timezone.utc).isoformat()
+    await db.cleanup_jobs.update_one({"id": job["id"]}, {"$set": update})
+
+async def cleanup_worker_loop():
+    while True:
+        try:
+            job = await claim_cleanup_job()
+            if job:
+                await run_cleanup_job(job)
+                continue
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Cleanup worker error: {e}")
+        
+        cleanup_wakeup.clear()
+        try:
+            await asyncio.wait_for(cleanup_wakeup.wait(), timeout=CLEANUP_POLL_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+async def dangling_video_ids(collection: str, field: str):
+    """Yield distinct video ids in collection.field that match no video.
+
+    Runs server-side as a cursor, so neither the referenced ids nor the
+    result have to fit in one document or in this process's memory.
+    """
+    pipeline = [
+        {"$match": {field: {"$exists": True}}},
+        {"$project": {"_id": 0, "ref": f"${field}"}},
+        {"$unwind": "$ref"},
+        {"$match": {"ref": {"$type": "string"}}},
+        {"$group": {"_id": "$ref"}},
+        {"$lookup": {"from": "videos", "localField": "_id", "foreignField": "id", "as": "video"}},
+        {"$match": {"video": {"$size": 0}}},
+        {"$project": {"_id": 1}}
+    ]
+    cursor = db[collection].aggregate(pipeline, allowDiskUse=True, batchSize=CLEANUP_BATCH_SIZE)
+    async for row in cursor:
+        yield row["_id"]
+
+async def reconcile_references():
+    """Enqueue cleanups for video ids referenced elsewhere but no longer existing.
+
+    Users are deliberately not reconciled: comments and playlists are keyed by
+    username, which changes on rename, so a missing username does not prove
+    the account was deleted.
+    """
+    queued = 0
+    for collection, field in VIDEO_REFERENCE_FIELDS:
+        # Enqueueing is idempotent, so an id dangling in several places is queued once
+        async for video_id in dangling_video_ids(collection, field):
+            await enqueue_cleanup("video_deleted", video_id)
+            queued += 1
+    if queued:
+        logger.info(f"Reconciliation queued {queued} video cleanups")
+
+async def acquire_sweep_lease() -> bool:
+    """Claim the reconciliation sweep for this worker until the next interval.
+
+    The lease is never released early: holding it for a whole interval is what
+    keeps the other workers from re-running the sweep right after it.
+    """
+    now = datetime.now(timezone.utc)
+    try:
+        lease = await db.cleanup_jobs.find_one_and_update(
+            {"id": CLEANUP_SWEEP_LEASE_ID, "lease_until": {"$lte": now}},
+            {
+                "$set": {
+                    "lease_until": now + timedelta(seconds=CLEANUP_SWEEP_INTERVAL),
+                    "holder": f"{socket.gethostname()}:{os.getpid()}",
+                    "updated_at": now.isoformat()
+                },
+                "$setOnInsert": {"type": "sweep_lease", "created_at": now.isoformat()}
+            },
+            upsert=True,
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        # Another worker holds an unexpired lease, so the upsert collided with it
+        return False
+    return lease is not None
+
+async def cleanup_sweep_loop():
+    while True:
+        await asyncio.sleep(CLEANUP_SWEEP_INTERVAL)
+        try:
+            if await acquire_sweep_lease():
+                await reconcile_references()
+        except Exception as e:
+            logger.error(f"Reference reconciliation failed: {e}")
+
+@api_router.get("/admin/cleanup-jobs")
+async def admin_get_cleanup_jobs(status: Optional[str] = None, admin=Depends(get_admin)):
+    query = {"status": status} if status else {"type": {"$ne": "sweep_lease"}}
+    jobs = await db.cleanup_jobs.find(query, {"_id": 0}).sort("created_at", -1).to_list(100)
+    return jobs
+
+# ===== ADMIN EXPORT / IMPORT =====
+# Exports stream straight from a Motor cursor so memory stays flat no matter how
+# large the collection is. Fields are listed explicitly: password hashes and
+# avatar data URLs never leave the database through here.
+EXPORT_BATCH_SIZE = 500
+IMPORT_BATCH_SIZE = 500
+IMPORT_MAX_LINE_BYTES = 1024 * 1024
+IMPORT_MAX_ERRORS = 100
+
+EXPORT_FIELDS = {
+    "users": ["username", "display_name", "email", "watch_later", "liked_videos", "created_at"],
+    "videos": ["id", "title.id", "title.en", "description.id", "description.en", "embed_url",
+               "category.id", "category.en", "episode", "views", "thumbnail_url", "created_at"],
+    "comments": ["id", "video_id", "user_id", "username", "comment", "parent_comment_id", "replies", "created_at"],
+    "categories": ["id", "name.id", "name.en", "thumbnail_url", "color"],
+    "pages": ["id", "page_name", "content.id", "content.en"],
+    "playlists": ["id", "name", "description", "user_id", "video_ids", "thumbnail_url", "created_at", "is_public"],
+}
+
+# collection -> (model, upsert key)
+IMPORT_TARGETS = {
+    "videos": (Video, "id"),
+    "categories": (Category, "id"),
+    "pages": (Page, "page_name"),
+}
+
+def get_dotted(doc: dict, path: str):
+    value = doc
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+def csv_value(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+async def stream_ndjson(cursor):
+    chunk = []
+    async for doc in cursor:
+        chunk.append(json.dumps(doc, ensure_ascii=False))
+        if len(chunk) >= EXPORT_BATCH_SIZE:
+            yield "\n".join(chunk) + "\n"
+            chunk = []
+    if chunk:
+        yield "\n".join(chunk) + "\n"
+
+async def stream_csv(cursor, fields: List[str]):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    rows = 0
+    async for doc in cursor:
+        writer.writerow([csv_value(get_dotted(doc, f)) for f in fields])
+        rows += 1
+        if rows >= EXPORT_BATCH_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+            rows = 0
+    yield buffer.getvalue()
+
+@api_router.get("/admin/export/{collection}")
+async def admin_export(collection: str, format: str = "ndjson", admin=Depends(get_admin)):
+    fields = EXPORT_FIELDS.get(collection)
+    if fields is None:
+        raise HTTPException(status_code=404, detail="Unknown collection")
+    if format not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="Format must be ndjson or csv")
+    
+    projection = {"_id": 0, **{f: 1 for f in fields}}
+    cursor = db[collection].find({}, projection).batch_size(EXPORT_BATCH_SIZE)
+    
+    if format == "csv":
+        body = stream_csv(cursor, fields)
+        media_type = "text/csv"
+    else:
+        body = stream_ndjson(cursor)
+        media_type = "application/x-ndjson"
+    
+    filename = f"{collection}.{format}"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+async def iter_ndjson_lines(chunks, max_line_bytes: Optional[int] = None):
+    """Yield non-blank lines from a byte stream; yields None in place of a line over max_line_bytes."""
+    max_line_bytes = max_line_bytes or IMPORT_MAX_LINE_BYTES
+    pending = b""
+    skipping = False  # inside an oversized line, discarding until its newline
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            if skipping:
+                skipping = False
+                continue
+            if len(line) > max_line_bytes:
+                yield None
+            elif line.strip():
+                yield line
+        if len(pending) > max_line_bytes:
+            if not skipping:
+                yield None
+                skipping = True
+            pending = b""
+    if pending.strip() and not skipping:
+        yield pending
+
+async def write_import_batch(collection: str, ops: list, op_lines: List[int], errors: list) -> int:
+    """Bulk-upsert one batch; returns how many documents were written and records per-line failures."""
+    try:
+        await db[collection].bulk_write(ops, ordered=False)
+        return len(ops)
+    except BulkWriteError as e:
+        write_errors = e.details.get("writeErrors", [])
+        for err in write_errors:
+            if len(errors) < IMPORT_MAX_ERRORS:
+                errors.append({"line": op_lines[err["index"]], "error": err.get("errmsg", "write failed")})
+        return len(ops) - len(write_errors)
+
+@api_router.post("/admin/import/{collection}")
+async def admin_import(collection: str, request: Request, admin=Depends(get_admin)):
+    """Restore documents from an NDJSON body, upserting in batches by their key."""
+    target = IMPORT_TARGETS.get(collection)
+    if target is None:
+        raise HTTPException(status_code=404, detail="Unknown collection")
+    model, key = target
+    
+    imported = 0
+    errors = []
+    ops = []
+    op_lines = []
+    line_no = 0
+    try:
+        async for line in iter_ndjson_lines(request.stream()):
+            line_no += 1
+            if line is None:
+                if len(errors) < IMPORT_MAX_ERRORS:
+                    errors.append({"line": line_no, "error": f"Line exceeds {IMPORT_MAX_LINE_BYTES} bytes"})
+                continue
+            try:
+                doc = model(**json.loads(line)).model_dump()
+            except Exception as e:
+                if len(errors) < IMPORT_MAX_ERRORS:
+                    errors.append({"line": line_no, "error": str(e)})
+                continue
+            ops.append(UpdateOne({key: doc[key]}, {"$set": doc}, upsert=True))
+            op_lines.append(line_no)
+            if len(ops) >= IMPORT_BATCH_SIZE:
+                imported += await write_import_batch(collection, ops, op_lines, errors)
+                ops, op_lines = [], []
+        if ops:
+            imported += await write_import_batch(collection, ops, op_lines, errors)
+    except PyMongoError as e:
+        aborted = e
+    else:
+        aborted = None
+    
+    if collection == "videos" and imported:
+        await rebuild_all_episode_indexes()
+    read_cache.invalidate("videos:" if collection == "videos" else collection, "categories")
+    
+    if aborted:
+        # Earlier batches are already committed; say how far the import got
+        raise HTTPException(
+            status_code=500,
+            detail={"error": f"Import aborted: {str(aborted)}", "lines_read": line_no, "imported": imported, "errors": errors}
+        )
+    return {"imported": imported, "failed": line_no - imported, "errors": errors}
+
 # ===== INIT DEFAULT DATA =====
 @api_router.post("/init-defaults")
 async def init_defaults():
@@ -820,9 +2126,134 @@ async def init_defaults():
         ]
     )
     await db.settings.insert_one(default_settings.model_dump())
+    read_cache.invalidate("settings", "categories", "pages")
     
     return {"message": "Defaults initialized successfully"}
 
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# ===== STARTUP / READINESS =====
+# Warm-up runs in the background so /healthz answers immediately, while /readyz
+# stays 503 until the Mongo pool, indexes, bcrypt and read cache are all warm.
+WARMUP_MONGO_CONNECTIONS = int(os.environ.get('WARMUP_MONGO_CONNECTIONS', '10'))
+WARMUP_RETRY_DELAY = 2.0
+warmup_state = {"ready": False, "error": None, "completed_at": None}
+
+async def ensure_indexes():
+    await db.users.create_index("username")
+    await db.videos.create_index("id")
+    await db.videos.create_index([("created_at", -1)])
+    await db.videos.create_index("category.en")
+    await db.videos.create_index("category.id")
+    await db.comments.create_index("id")
+    await db.comments.create_index([("video_id", 1), ("created_at", -1)])
+    await db.categories.create_index("id")
+    await db.pages.create_index("page_name")
+    await db.playlists.create_index("id")
+    await db.ads.create_index([("enabled", 1), ("position", 1)])
+    await db.watch_progress.create_index([("user_id", 1), ("video_id", 1)], unique=True)
+    await db.watch_progress.create_index([("user_id", 1), ("completed", 1), ("updated_at", -1)])
+    await db.episode_index.create_index("category", unique=True)
+    await db.episode_index.create_index("names")
+    await db.episode_index.create_index("video_ids")
+    await db.comment_events.create_index("created_at", expireAfterSeconds=3600)
+    for collection in ANALYTICS_COLLECTIONS.values():
+        await db[collection].create_index([("scope", 1), ("key", 1), ("bucket", 1)], unique=True)
+        await db[collection].create_index([("scope", 1), ("bucket", 1)])
+    await db.analytics_hourly.create_index("expires_at", expireAfterSeconds=0)
+    await db.cleanup_jobs.create_index([("status", 1), ("lease_until", 1), ("created_at", 1)])
+    await db.cleanup_jobs.create_index([("type", 1), ("target", 1), ("status", 1)])
+    await db.cleanup_jobs.create_index("id", unique=True)
+    await db.cleanup_jobs.create_index("finished_at", expireAfterSeconds=int(CLEANUP_JOB_RETENTION.total_seconds()))
+    await db.users.create_index("watch_later")
+    await db.users.create_index("liked_videos")
+    await db.playlists.create_index("video_ids")
+    await db.playlists.create_index("user_id")
+    await db.comments.create_index("user_id")
+    await db.watch_progress.create_index("video_id")
+
+async def warm_translate_client():
+    if not LIBRETRANSLATE_API_KEY:
+        return
+    try:
+        await translate_http_client.get(f"{LIBRETRANSLATE_API_URL}/languages")
+    except httpx.HTTPError as e:
+        logger.warning(f"LibreTranslate warm-up failed: {e}")
+
+async def warm_up_once():
+    # Open several pooled connections up front instead of on first requests
+    await asyncio.gather(*[db.command("ping") for _ in range(WARMUP_MONGO_CONNECTIONS)])
+    await ensure_indexes()
+    
+    # First bcrypt call loads the backend; do it off the event loop
+    await asyncio.to_thread(lambda: verify_password("warmup", hash_password("warmup")))
+    await image_cache.load()
+    if await db.episode_index.count_documents({}) == 0:
+        await rebuild_all_episode_indexes()
+    await asyncio.gather(
+        get_settings(),
+        get_categories(),
+        get_pages(),
+        get_ads(),
+        get_videos(),
+        warm_translate_client()
+    )
+
+async def warm_up():
+    # Any failing step (e.g. a Mongo blip mid-preload) is recorded for /readyz and retried
+    while True:
+        try:
+            await warm_up_once()
+            break
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            warmup_state["error"] = str(e) or type(e).__name__
+            logger.exception("Warm-up failed, retrying")
+            await asyncio.sleep(WARMUP_RETRY_DELAY)
+    
+    warmup_state.update(ready=True, error=None, completed_at=datetime.now(timezone.utc).isoformat())
+    logger.info("Warm-up complete, worker is ready")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warmup_task = asyncio.create_task(warm_up())
+    watch_progress_task = asyncio.create_task(watch_progress_flush_loop())
+    comment_fanout_task = asyncio.create_task(comment_broadcaster.run())
+    cleanup_worker_task = asyncio.create_task(cleanup_worker_loop())
+    cleanup_sweep_task = asyncio.create_task(cleanup_sweep_loop())
+    yield
+    background_tasks = [warmup_task, watch_progress_task, comment_fanout_task, cleanup_worker_task, cleanup_sweep_task]
+    for task in background_tasks:
+        task.cancel()
+    # Let a flush interrupted mid-write put its entries back before the final flush
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    try:
+        await watch_progress_buffer.flush()
+    except Exception as e:
+        logger.error(f"Final watch progress flush failed: {e}")
+    # Let in-flight analytics writes land before the Mongo client goes away
+    await asyncio.gather(*analytics_tasks, return_exceptions=True)
+    await image_http_client.aclose()
+    await translate_http_client.aclose()
+    client.close()
+
+app = FastAPI(title="ShinDora Nesub API", lifespan=lifespan)
+
+@app.get("/healthz")
+async def healthz():
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    if not warmup_state["ready"]:
+        return JSONResponse(status_code=503, content={"status": "warming_up", "error": warmup_state["error"]})
+    return {"status": "ready", "completed_at": warmup_state["completed_at"]}
+
 app.include_router(api_router)
 
 app.add_middleware(
@@ -832,13 +2263,3 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
-
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
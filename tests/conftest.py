@@ -0,0 +1,270 @@
+import copy
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+# server.py lives in backend/ and is imported as a top-level module
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import server  # noqa: E402
+
+
+# ===== IN-MEMORY MONGO FAKE =====
+# Just enough of the Motor collection API for the handlers under test. Queries
+# support equality (including array membership), $in/$nin/$lt/$lte/$gt/$gte/$ne
+# and $or; updates support $set/$setOnInsert/$inc/$pull/$addToSet.
+MISSING = object()
+
+
+def get_field(doc, path):
+    value = doc
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return MISSING
+        value = value[part]
+    return value
+
+
+def compare(value, op, operand):
+    values = value if isinstance(value, list) else [value]
+    if op == "$in":
+        return any(v in operand for v in values)
+    if op == "$nin":
+        return not any(v in operand for v in values)
+    if op == "$ne":
+        return operand not in values
+    if value is MISSING:
+        return False
+    return {
+        "$lt": lambda v: v < operand,
+        "$lte": lambda v: v <= operand,
+        "$gt": lambda v: v > operand,
+        "$gte": lambda v: v >= operand,
+    }[op](value)
+
+
+def matches(doc, query):
+    for key, condition in (query or {}).items():
+        if key == "$or":
+            if not any(matches(doc, q) for q in condition):
+                return False
+            continue
+        value = get_field(doc, key)
+        if isinstance(condition, dict) and condition and all(k.startswith("$") for k in condition):
+            if not all(compare(value, op, operand) for op, operand in condition.items()):
+                return False
+        elif isinstance(value, list) and not isinstance(condition, list):
+            if condition not in value:
+                return False
+        elif (None if value is MISSING else value) != condition:
+            return False
+    return True
+
+
+def project(doc, projection):
+    doc = copy.deepcopy(doc)
+    if not projection:
+        return doc
+    included = [k for k, v in projection.items() if v and k != "_id"]
+    if included:
+        out = {}
+        for path in included:
+            value = get_field(doc, path)
+            if value is MISSING:
+                continue
+            target = out
+            parts = path.split(".")
+            for part in parts[:-1]:
+                target = target.setdefault(part, {})
+            target[parts[-1]] = value
+        if projection.get("_id", 1) and "_id" in doc:
+            out["_id"] = doc["_id"]
+        return out
+    if projection.get("_id") == 0:
+        doc.pop("_id", None)
+    return doc
+
+
+def apply_update(doc, update, inserting=False):
+    for field, value in update.get("$set", {}).items():
+        doc[field] = copy.deepcopy(value)
+    if inserting:
+        for field, value in update.get("$setOnInsert", {}).items():
+            doc[field] = copy.deepcopy(value)
+    for field, amount in update.get("$inc", {}).items():
+        doc[field] = doc.get(field, 0) + amount
+    for field, value in update.get("$pull", {}).items():
+        doc[field] = [v for v in doc.get(field, []) if v != value]
+    for field, value in update.get("$addToSet", {}).items():
+        doc.setdefault(field, [])
+        if value not in doc[field]:
+            doc[field].append(value)
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, key, direction=1):
+        keys = key if isinstance(key, list) else [(key, direction)]
+        for field, order in reversed(keys):
+            self.docs.sort(key=lambda d: get_field(d, field), reverse=order == -1)
+        return self
+
+    def limit(self, n):
+        if n:
+            self.docs = self.docs[:n]
+        return self
+
+    def batch_size(self, n):
+        return self
+
+    async def to_list(self, length):
+        return self.docs if length is None else self.docs[:length]
+
+    def __aiter__(self):
+        self._iter = iter(self.docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class FakeCollection:
+    def __init__(self, unique=()):
+        self.docs = []
+        self.unique = unique
+        self._next_id = 1
+        # Optional coroutine run before every write, e.g. to raise or to interleave
+        self.before_write = None
+
+    async def _write_hook(self, *args):
+        if self.before_write:
+            await self.before_write(*args)
+
+    def _insert(self, doc):
+        for field in self.unique:
+            if any(d.get(field) == doc.get(field) for d in self.docs):
+                raise DuplicateKeyError(f"duplicate {field}")
+        doc.setdefault("_id", self._next_id)
+        self._next_id += 1
+        self.docs.append(doc)
+
+    def find(self, query=None, projection=None):
+        return FakeCursor([project(d, projection) for d in self.docs if matches(d, query)])
+
+    async def find_one(self, query=None, projection=None):
+        for doc in self.docs:
+            if matches(doc, query):
+                return project(doc, projection)
+        return None
+
+    async def count_documents(self, query):
+        return sum(1 for d in self.docs if matches(d, query))
+
+    async def distinct(self, field, query=None):
+        values = []
+        for doc in self.docs:
+            if not matches(doc, query):
+                continue
+            value = get_field(doc, field)
+            for v in value if isinstance(value, list) else [value]:
+                if v is not MISSING and v not in values:
+                    values.append(v)
+        return values
+
+    async def insert_one(self, doc):
+        await self._write_hook("insert_one", doc)
+        self._insert(copy.deepcopy(doc))
+
+    async def insert_many(self, docs):
+        for doc in docs:
+            await self.insert_one(doc)
+
+    def _upsert_doc(self, query, update):
+        doc = {k: v for k, v in query.items() if not k.startswith("$") and not isinstance(v, dict)}
+        apply_update(doc, update, inserting=True)
+        self._insert(doc)
+        return doc
+
+    async def update_one(self, query, update, upsert=False):
+        await self._write_hook("update_one", query, update)
+        for doc in self.docs:
+            if matches(doc, query):
+                before = copy.deepcopy(doc)
+                apply_update(doc, update)
+                return SimpleNamespace(matched_count=1, modified_count=int(before != doc), upserted_id=None)
+        if upsert:
+            doc = self._upsert_doc(query, update)
+            return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=doc["_id"])
+        return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=None)
+
+    async def update_many(self, query, update):
+        await self._write_hook("update_many", query, update)
+        for doc in self.docs:
+            if matches(doc, query):
+                apply_update(doc, update)
+
+    async def find_one_and_update(self, query, update, projection=None, upsert=False, return_document=False, sort=None):
+        await self._write_hook("find_one_and_update", query, update)
+        for doc in self.docs:
+            if matches(doc, query):
+                before = project(doc, projection)
+                apply_update(doc, update)
+                return project(doc, projection) if return_document else before
+        if upsert:
+            doc = self._upsert_doc(query, update)
+            return project(doc, projection) if return_document else None
+        return None
+
+    async def delete_one(self, query):
+        await self._write_hook("delete_one", query)
+        for doc in self.docs:
+            if matches(doc, query):
+                self.docs.remove(doc)
+                return SimpleNamespace(deleted_count=1)
+        return SimpleNamespace(deleted_count=0)
+
+    async def delete_many(self, query):
+        await self._write_hook("delete_many", query)
+        before = len(self.docs)
+        self.docs = [d for d in self.docs if not matches(d, query)]
+        return SimpleNamespace(deleted_count=before - len(self.docs))
+
+    async def bulk_write(self, ops, ordered=True):
+        await self._write_hook("bulk_write", ops)
+        for op in ops:
+            # pymongo exposes no public accessors for a queued UpdateOne
+            await self.update_one(op._filter, op._doc, upsert=op._upsert)
+
+    async def create_index(self, *args, **kwargs):
+        pass
+
+
+class FakeDb:
+    def __init__(self):
+        self._collections = {}
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def __getitem__(self, name):
+        return self._collections.setdefault(name, FakeCollection())
+
+    async def command(self, *args):
+        return {"ok": 1}
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    db = FakeDb()
+    monkeypatch.setattr(server, "db", db)
+    return db
@@ -0,0 +1,140 @@
+import asyncio
+import csv
+import io
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from pymongo.errors import AutoReconnect, BulkWriteError
+
+import server
+
+
+async def agen(items):
+    for item in items:
+        yield item
+
+
+async def collect(gen):
+    return [item async for item in gen]
+
+
+def ndjson_request(*chunks):
+    return SimpleNamespace(stream=lambda: agen(chunks))
+
+
+def page_line(name, en="text"):
+    return json.dumps({"page_name": name, "content": {"id": "teks", "en": en}}).encode()
+
+
+def test_get_dotted():
+    doc = {"title": {"en": "Hello"}, "views": 3}
+    assert server.get_dotted(doc, "title.en") == "Hello"
+    assert server.get_dotted(doc, "views") == 3
+    assert server.get_dotted(doc, "title.id") is None
+    assert server.get_dotted(doc, "views.en") is None
+
+
+def test_csv_value_flattens_lists_and_none():
+    assert server.csv_value(None) == ""
+    assert server.csv_value(["a", "b"]) == '["a", "b"]'
+    assert server.csv_value({"k": "é"}) == '{"k": "é"}'
+    assert server.csv_value(5) == "5"
+
+
+def test_stream_csv_writes_header_and_dotted_columns(monkeypatch):
+    monkeypatch.setattr(server, "EXPORT_BATCH_SIZE", 2)
+    docs = [{"id": str(i), "title": {"en": f"t,{i}"}, "replies": ["x"]} for i in range(3)]
+
+    chunks = asyncio.run(collect(server.stream_csv(agen(docs), ["id", "title.en", "replies"])))
+    rows = list(csv.reader(io.StringIO("".join(chunks))))
+
+    assert len(chunks) == 2
+    assert rows[0] == ["id", "title.en", "replies"]
+    assert rows[1:] == [[str(i), f"t,{i}", '["x"]'] for i in range(3)]
+
+
+def test_stream_ndjson_round_trips():
+    docs = [{"id": "1", "title": {"en": "a"}}, {"id": "2"}]
+    body = "".join(asyncio.run(collect(server.stream_ndjson(agen(docs)))))
+    assert [json.loads(line) for line in body.splitlines()] == docs
+
+
+def test_ndjson_lines_split_across_chunks():
+    chunks = [b'{"a":', b' 1}\n\n{"b"', b': 2}\n{"c": 3}']
+    lines = asyncio.run(collect(server.iter_ndjson_lines(agen(chunks))))
+    assert lines == [b'{"a": 1}', b'{"b": 2}', b'{"c": 3}']
+
+
+def test_oversized_ndjson_line_is_reported_not_buffered():
+    chunks = [b"ok1\n" + b"x" * 8, b"x" * 8, b"x" * 8 + b"\nok2\n", b"y" * 20 + b"\nok3"]
+    lines = asyncio.run(collect(server.iter_ndjson_lines(agen(chunks), max_line_bytes=10)))
+    assert lines == [b"ok1", None, b"ok2", None, b"ok3"]
+
+
+def test_import_counts_invalid_and_oversized_lines(fake_db, monkeypatch):
+    monkeypatch.setattr(server, "IMPORT_MAX_LINE_BYTES", 200)
+    request = ndjson_request(
+        page_line("about") + b"\n",
+        b"not json\n",
+        b'{"content": {}}\n',
+        page_line("terms", en="x" * 300) + b"\n",
+        page_line("privacy"),
+    )
+
+    result = asyncio.run(server.admin_import("pages", request, admin=None))
+
+    assert result["imported"] == 2
+    assert result["failed"] == 3
+    assert [e["line"] for e in result["errors"]] == [2, 3, 4]
+    assert sorted(d["page_name"] for d in fake_db.pages.docs) == ["about", "privacy"]
+
+
+def test_import_upserts_by_key(fake_db):
+    asyncio.run(server.admin_import("pages", ndjson_request(page_line("about", en="old")), admin=None))
+    asyncio.run(server.admin_import("pages", ndjson_request(page_line("about", en="new")), admin=None))
+
+    assert len(fake_db.pages.docs) == 1
+    assert fake_db.pages.docs[0]["content"]["en"] == "new"
+
+
+def test_import_reports_bulk_write_errors_and_continues(fake_db, monkeypatch):
+    monkeypatch.setattr(server, "IMPORT_BATCH_SIZE", 2)
+    calls = []
+
+    async def fail_first_batch(op, *args):
+        if op == "bulk_write":
+            calls.append(op)
+            if len(calls) == 1:
+                raise BulkWriteError({"writeErrors": [{"index": 1, "errmsg": "E11000 duplicate"}]})
+
+    fake_db.pages.before_write = fail_first_batch
+    request = ndjson_request(*[page_line(n) + b"\n" for n in ["a", "b", "c"]])
+
+    result = asyncio.run(server.admin_import("pages", request, admin=None))
+
+    assert result["imported"] == 2
+    assert result["failed"] == 1
+    assert result["errors"] == [{"line": 2, "error": "E11000 duplicate"}]
+
+
+def test_import_abort_reports_progress(fake_db, monkeypatch):
+    monkeypatch.setattr(server, "IMPORT_BATCH_SIZE", 1)
+    writes = []
+
+    async def drop_connection(op, *args):
+        if op == "bulk_write":
+            writes.append(op)
+            if len(writes) == 2:
+                raise AutoReconnect("connection lost")
+
+    fake_db.pages.before_write = drop_connection
+    request = ndjson_request(*[page_line(n) + b"\n" for n in ["a", "b", "c"]])
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(server.admin_import("pages", request, admin=None))
+
+    assert exc.value.status_code == 500
+    assert exc.value.detail["imported"] == 1
+    assert exc.value.detail["lines_read"] == 2
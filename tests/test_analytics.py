@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+
+def query(**kwargs):
+    params = {"start": "2026-01-01", "end": "2026-01-07", "scope": "category", "key": None, "granularity": "day"}
+    params.update(kwargs)
+    return asyncio.run(server.admin_get_analytics(admin=None, **params))
+
+
+def test_video_scope_requires_key():
+    with pytest.raises(HTTPException) as exc:
+        query(scope="video")
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.parametrize("granularity,end", [("hour", "2026-02-01"), ("day", "2027-01-02")])
+def test_range_is_capped(granularity, end):
+    with pytest.raises(HTTPException) as exc:
+        query(granularity=granularity, end=end)
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"start": "01/01/2026"},
+    {"start": "2026-01-08"},
+    {"scope": "user"},
+    {"granularity": "minute"},
+])
+def test_invalid_parameters_are_rejected(kwargs):
+    with pytest.raises(HTTPException) as exc:
+        query(**kwargs)
+    assert exc.value.status_code == 400
+
+
+def rollups(fake_db, collection):
+    return {(d["scope"], d["key"]): d for d in fake_db[collection].docs}
+
+
+def test_view_is_recorded_in_the_background(fake_db):
+    fake_db.videos.docs.append({"id": "v1", "views": 0, "category": {"en": "Doraemon"}})
+
+    async def scenario():
+        await server.increment_view("v1")
+        # The response doesn't wait for the rollup writes
+        assert fake_db.analytics_daily.docs == []
+        await asyncio.gather(*server.analytics_tasks)
+
+    asyncio.run(scenario())
+    for collection in ("analytics_hourly", "analytics_daily"):
+        docs = rollups(fake_db, collection)
+        assert set(docs) == {("video", "v1"), ("category", "Doraemon")}
+        assert all(d["views"] == 1 for d in docs.values())
+    assert "expires_at" in fake_db.analytics_hourly.docs[0]
+    assert "expires_at" not in fake_db.analytics_daily.docs[0]
+    assert not server.analytics_tasks
+
+
+def test_category_is_looked_up_when_not_given(fake_db):
+    fake_db.videos.docs.append({"id": "v1", "category": {"en": "Doraemon"}})
+
+    asyncio.run(server.record_analytics_event("likes", "v1", amount=-1))
+    assert rollups(fake_db, "analytics_daily")[("category", "Doraemon")]["likes"] == -1
+
+
+def test_recording_failure_is_logged_not_raised(fake_db, caplog):
+    async def fail(*args):
+        raise RuntimeError("mongo down")
+
+    fake_db.analytics_daily.before_write = fail
+    asyncio.run(server.record_analytics_event("views", "v1", {}))
+    assert "Failed to record views analytics for v1" in caplog.text
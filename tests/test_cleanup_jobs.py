@@ -0,0 +1,131 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import server
+
+
+def seed(collection, *docs):
+    asyncio.run(collection.insert_many(docs))
+
+
+def seed_user_data(fake_db, username="alice"):
+    seed(fake_db.comments, {"id": "c1", "user_id": username, "video_id": "v1"})
+    seed(fake_db.playlists, {"id": "p1", "user_id": username, "video_ids": ["v1"]})
+
+
+def test_user_cleanup_skips_reregistered_username(fake_db):
+    seed(fake_db.users, {"username": "alice"})
+    seed_user_data(fake_db)
+
+    assert asyncio.run(server.cleanup_deleted_user("alice")) == "username registered again"
+    assert len(fake_db.comments.docs) == 1
+    assert len(fake_db.playlists.docs) == 1
+
+
+def test_user_cleanup_runs_when_user_is_gone(fake_db):
+    seed_user_data(fake_db)
+    seed(fake_db.comments, {"id": "c2", "user_id": "bob", "video_id": "v1"})
+
+    assert asyncio.run(server.cleanup_deleted_user("alice")) is None
+    assert [c["id"] for c in fake_db.comments.docs] == ["c2"]
+    assert fake_db.playlists.docs == []
+
+
+def test_video_cleanup_skips_restored_video(fake_db):
+    seed(fake_db.videos, {"id": "v1"})
+    seed(fake_db.users, {"username": "alice", "watch_later": ["v1"], "liked_videos": ["v1"]})
+
+    assert asyncio.run(server.cleanup_deleted_video("v1")) == "video exists again"
+    assert fake_db.users.docs[0]["watch_later"] == ["v1"]
+
+
+def test_video_cleanup_removes_references(fake_db):
+    seed(fake_db.users, {"username": "alice", "watch_later": ["v1", "v2"], "liked_videos": ["v1"]})
+    seed(fake_db.playlists, {"id": "p1", "user_id": "alice", "video_ids": ["v1", "v2"]})
+    seed(fake_db.comments, {"id": "c1", "user_id": "alice", "video_id": "v1"})
+
+    assert asyncio.run(server.cleanup_deleted_video("v1")) is None
+    assert fake_db.users.docs[0]["watch_later"] == ["v2"]
+    assert fake_db.users.docs[0]["liked_videos"] == []
+    assert fake_db.playlists.docs[0]["video_ids"] == ["v2"]
+    assert fake_db.comments.docs == []
+
+
+def test_skipped_job_is_recorded_as_finished(fake_db):
+    seed(fake_db.users, {"username": "alice"})
+    seed(fake_db.cleanup_jobs, {"id": "j1", "type": "user_deleted", "target": "alice", "status": "running", "attempts": 1})
+
+    asyncio.run(server.run_cleanup_job(fake_db.cleanup_jobs.docs[0]))
+    job = fake_db.cleanup_jobs.docs[0]
+    assert job["status"] == "skipped"
+    assert isinstance(job["finished_at"], datetime)
+
+
+def test_failed_attempt_is_not_finished(fake_db):
+    async def fail(*args):
+        raise RuntimeError("mongo down")
+
+    seed(fake_db.cleanup_jobs, {"id": "j1", "type": "user_deleted", "target": "alice", "status": "running", "attempts": 1})
+    seed_user_data(fake_db)
+    fake_db.comments.before_write = fail
+
+    asyncio.run(server.run_cleanup_job(fake_db.cleanup_jobs.docs[0]))
+    job = fake_db.cleanup_jobs.docs[0]
+    assert job["status"] == "pending"
+    assert "finished_at" not in job
+
+
+def test_reconciliation_checks_video_references_only(fake_db, monkeypatch):
+    # A renamed user's comments/playlists still carry the old username
+    dangling = {("comments", "video_id"): ["gone"], ("users", "liked_videos"): ["gone", "also-gone"]}
+    scanned = []
+    queued = []
+
+    async def fake_dangling(collection, field):
+        scanned.append((collection, field))
+        for video_id in dangling.get((collection, field), []):
+            yield video_id
+
+    async def enqueue(job_type, target):
+        queued.append((job_type, target))
+
+    monkeypatch.setattr(server, "dangling_video_ids", fake_dangling)
+    monkeypatch.setattr(server, "enqueue_cleanup", enqueue)
+    asyncio.run(server.reconcile_references())
+
+    assert all(field not in ("user_id", "username") for _, field in scanned)
+    assert sorted(queued) == [("video_deleted", "also-gone"), ("video_deleted", "gone"), ("video_deleted", "gone")]
+
+
+def test_only_one_worker_holds_the_sweep_lease(fake_db):
+    fake_db.cleanup_jobs.unique = ("id",)
+
+    async def two_workers():
+        return await server.acquire_sweep_lease(), await server.acquire_sweep_lease()
+
+    assert asyncio.run(two_workers()) == (True, False)
+    (lease,) = fake_db.cleanup_jobs.docs
+    assert lease["type"] == "sweep_lease"
+    assert lease["lease_until"] > datetime.now(timezone.utc)
+
+
+def test_expired_sweep_lease_can_be_taken_over(fake_db):
+    fake_db.cleanup_jobs.unique = ("id",)
+    seed(fake_db.cleanup_jobs, {
+        "id": server.CLEANUP_SWEEP_LEASE_ID,
+        "type": "sweep_lease",
+        "lease_until": datetime.now(timezone.utc) - timedelta(seconds=1),
+    })
+
+    assert asyncio.run(server.acquire_sweep_lease()) is True
+    assert len(fake_db.cleanup_jobs.docs) == 1
+
+
+def test_sweep_lease_is_not_a_claimable_job(fake_db):
+    fake_db.cleanup_jobs.unique = ("id",)
+
+    async def scenario():
+        await server.acquire_sweep_lease()
+        return await server.claim_cleanup_job(), await server.admin_get_cleanup_jobs(admin=None)
+
+    assert asyncio.run(scenario()) == (None, [])
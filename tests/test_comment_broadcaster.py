@@ -0,0 +1,144 @@
+import asyncio
+
+import server
+
+
+def publish(broadcaster, video_id, count, event_type="comment_created"):
+    async def main():
+        for i in range(count):
+            await broadcaster.publish(video_id, event_type, {"n": i})
+    asyncio.run(main())
+
+
+def test_subscriber_receives_published_events():
+    broadcaster = server.CommentBroadcaster()
+    subscriber, backlog, reset = broadcaster.subscribe("v1")
+    publish(broadcaster, "v1", 2)
+    publish(broadcaster, "v2", 1)
+
+    assert backlog == [] and reset is False
+    assert [subscriber.queue.get_nowait()["data"]["n"] for _ in range(2)] == [0, 1]
+    assert subscriber.queue.empty()
+
+
+def test_resume_replays_only_missed_events():
+    broadcaster = server.CommentBroadcaster()
+    publish(broadcaster, "v1", 3)
+    first_id = broadcaster._history["v1"][0]["id"]
+
+    _, backlog, reset = broadcaster.subscribe("v1", first_id)
+    assert reset is False
+    assert [e["data"]["n"] for e in backlog] == [1, 2]
+
+
+def test_resume_from_unknown_id_requests_reset():
+    broadcaster = server.CommentBroadcaster()
+    publish(broadcaster, "v1", 3)
+
+    _, backlog, reset = broadcaster.subscribe("v1", "previous-process-1")
+    assert backlog == []
+    assert reset is True
+
+
+def test_slow_subscriber_is_dropped():
+    broadcaster = server.CommentBroadcaster()
+    subscriber, _, _ = broadcaster.subscribe("v1")
+    publish(broadcaster, "v1", server.COMMENT_SUBSCRIBER_QUEUE_SIZE + 1)
+
+    assert subscriber.lagged is True
+    assert "v1" not in broadcaster._subscribers
+
+
+def test_history_is_bounded_to_recent_videos(monkeypatch):
+    monkeypatch.setattr(server, "COMMENT_HISTORY_VIDEOS", 2)
+    broadcaster = server.CommentBroadcaster()
+    broadcaster.subscribe("watched")
+    for video_id in ["watched", "a", "b", "c"]:
+        publish(broadcaster, video_id, 1)
+
+    assert set(broadcaster._history) == {"watched", "c"}
+
+
+class FakeChangeStream:
+    def __init__(self, changes, error):
+        self.changes = changes
+        self.error = error
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.changes:
+            return self.changes.pop(0)
+        raise self.error
+
+
+class FakeEvents:
+    """comment_events whose watch() replays scripted (changes, error) sessions."""
+    def __init__(self, sessions):
+        self.sessions = sessions
+        self.resume_tokens = []
+
+    def watch(self, pipeline, resume_after=None):
+        self.resume_tokens.append(resume_after)
+        if not self.sessions:
+            raise asyncio.CancelledError
+        changes, error = self.sessions.pop(0)
+        return FakeChangeStream(changes, error)
+
+
+def change(token, n):
+    return {"_id": token, "fullDocument": {"_id": f"doc{n}", "video_id": "v1", "type": "comment_created", "data": {"n": n}}}
+
+
+def run_change_stream(monkeypatch, sessions):
+    monkeypatch.setattr(server, "COMMENT_STREAM_RETRY_DELAY", 0)
+    events = FakeEvents(sessions)
+    monkeypatch.setattr(server, "db", type("Db", (), {"comment_events": events})())
+    broadcaster = server.ChangeStreamCommentBroadcaster()
+    subscriber, _, _ = broadcaster.subscribe("v1")
+
+    async def main():
+        try:
+            await broadcaster.run()
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(main())
+    received = []
+    while not subscriber.queue.empty():
+        received.append(subscriber.queue.get_nowait())
+    return events, broadcaster, received
+
+
+def test_change_stream_resumes_after_last_event(monkeypatch):
+    events, _, received = run_change_stream(monkeypatch, [
+        ([change({"t": 1}, 1), change({"t": 2}, 2)], server.OperationFailure("connection reset", code=6)),
+        ([change({"t": 3}, 3)], server.OperationFailure("connection reset", code=6)),
+    ])
+
+    assert events.resume_tokens == [None, {"t": 2}, {"t": 3}]
+    assert [e["data"]["n"] for e in received] == [1, 2, 3]
+
+
+def test_expired_resume_token_resets_subscribers(monkeypatch):
+    events, broadcaster, received = run_change_stream(monkeypatch, [
+        ([change({"t": 1}, 1)], server.OperationFailure("stale", code=6)),
+        ([], server.OperationFailure("history lost", code=286)),
+        ([change({"t": 9}, 9)], server.OperationFailure("stale", code=6)),
+    ])
+
+    assert events.resume_tokens[:3] == [None, {"t": 1}, None]
+    assert [e["type"] for e in received] == ["comment_created", "reset", "comment_created"]
+    assert [e["id"] for e in broadcaster._history["v1"]] == ["doc9"]
+
+
+def test_reset_event_has_no_id():
+    assert server.format_sse({"id": None, "type": "reset", "data": {}}) == "event: reset\ndata: {}\n\n"
+    assert server.format_sse({"id": "a-1", "type": "x", "data": {}}).startswith("id: a-1\n")
@@ -0,0 +1,55 @@
+import asyncio
+
+import server
+
+
+def test_numeric_labels_sort_naturally():
+    labels = ["10", "2", "10.5", "1", "3b"]
+    assert sorted(labels, key=server.episode_sort_key) == ["1", "2", "3b", "10", "10.5"]
+
+
+def test_prefixed_labels_sort_by_number():
+    labels = ["Episode 12", "Episode 3", "EP 1", "Episode 10.5"]
+    assert sorted(labels, key=server.episode_sort_key) == ["EP 1", "Episode 3", "Episode 10.5", "Episode 12"]
+
+
+def test_labels_without_numbers_go_last():
+    labels = ["Special", "2", "OVA", "", "Episode 1"]
+    assert sorted(labels, key=server.episode_sort_key) == ["Episode 1", "2", "", "OVA", "Special"]
+
+
+def test_category_key_prefers_english_name():
+    assert server.category_key({"id": "Doraemon ID", "en": "Doraemon"}) == "Doraemon"
+    assert server.category_key({"id": "Doraemon ID", "en": ""}) == "Doraemon ID"
+
+
+def video(video_id, category, episode, created_at="2026-01-01"):
+    return {"id": video_id, "category": {"id": category, "en": category}, "episode": episode,
+            "title": {"id": "", "en": ""}, "thumbnail_url": "", "created_at": created_at}
+
+
+def test_rebuild_all_orders_episodes_and_serves_neighbors(fake_db):
+    fake_db.videos.docs.extend([
+        video("e10", "Doraemon", "Episode 10"),
+        video("e2", "Doraemon", "Episode 2"),
+        video("e3", "Doraemon", "Episode 3"),
+    ])
+    asyncio.run(server.rebuild_all_episode_indexes())
+
+    episodes = asyncio.run(server.get_category_episodes("Doraemon"))
+    assert [e["id"] for e in episodes] == ["e2", "e3", "e10"]
+    neighbors = asyncio.run(server.get_video_neighbors("e3"))
+    assert neighbors["previous"]["id"] == "e2"
+    assert neighbors["next"]["id"] == "e10"
+
+
+def test_rebuild_all_drops_indexes_of_emptied_categories(fake_db):
+    fake_db.videos.docs.extend([video("a", "Doraemon", "1"), video("b", "Hattori", "1")])
+    asyncio.run(server.rebuild_all_episode_indexes())
+
+    # An import moves every Hattori video into Doraemon
+    fake_db.videos.docs[1]["category"] = {"id": "Doraemon", "en": "Doraemon"}
+    asyncio.run(server.rebuild_all_episode_indexes())
+
+    assert [d["category"] for d in fake_db.episode_index.docs] == ["Doraemon"]
+    assert asyncio.run(server.get_video_neighbors("b"))["category"] == "Doraemon"
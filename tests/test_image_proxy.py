@@ -0,0 +1,310 @@
+import asyncio
+import io
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from fastapi import HTTPException
+from PIL import Image
+
+import server
+
+SVG = b'<svg xmlns="http://www.w3.org/2000/svg"><script>alert(1)</script></svg>'
+
+
+def make_jpeg(size=(2000, 1000)):
+    out = io.BytesIO()
+    Image.new("RGB", size, "red").save(out, "JPEG")
+    return out.getvalue()
+
+
+def make_png_header_bomb(width, height):
+    """A real 1x1 PNG whose header claims width x height pixels."""
+    out = io.BytesIO()
+    Image.new("L", (1, 1)).save(out, "PNG")
+    data = bytearray(out.getvalue())
+    # IHDR data starts after the 8-byte signature and the chunk's length/type
+    ihdr = bytes(data[12:16]) + struct.pack(">II", width, height) + bytes(data[24:29])
+    data[16:24] = struct.pack(">II", width, height)
+    data[29:33] = struct.pack(">I", zlib.crc32(ihdr))
+    return bytes(data)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    hits = Counter()
+    hosts = []
+    delay = 0.0
+    files = {}
+
+    def do_GET(self):
+        type(self).hits[self.path] += 1
+        type(self).hosts.append(self.headers["Host"])
+        if self.path == "/redirect-internal":
+            self.send_response(302)
+            self.send_header("Location", f"http://127.0.0.2:{self.server.server_port}/big.jpg")
+            self.end_headers()
+            return
+        time.sleep(type(self).delay)
+        body, content_type = type(self).files.get(self.path, (None, None))
+        if body is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub(monkeypatch, tmp_path):
+    StubHandler.hits = Counter()
+    StubHandler.hosts = []
+    StubHandler.delay = 0.0
+    StubHandler.files = {
+        "/big.jpg": (make_jpeg(), "image/jpeg"),
+        "/truncated.jpg": (make_jpeg()[:2000], "image/jpeg"),
+        "/bomb.png": (make_png_header_bomb(20000, 20000), "image/png"),
+        "/over-cap.png": (make_png_header_bomb(6000, 6000), "image/png"),
+        "/logo.svg": (SVG, "image/svg+xml"),
+        "/page.html": (b"<html>hi</html>", "text/html"),
+    }
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+
+    port = httpd.server_port
+    monkeypatch.setattr(server, "image_cache", server.ImageCache(tmp_path, 10 * 1024 * 1024))
+    monkeypatch.setattr(server, "IMAGE_ALLOWED_PORTS", {80, 443, port})
+    monkeypatch.setattr(server, "IMAGE_ALLOWED_HOSTS", {"127.0.0.1", "127.0.0.2", "images.example"})
+
+    async def no_content_hosts():
+        return set()
+
+    monkeypatch.setattr(server, "image_content_hosts", no_content_hosts)
+    yield f"http://127.0.0.1:{port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def allow_stub_host(monkeypatch):
+    # The stub is on loopback, which the proxy refuses; let exactly that address through
+    monkeypatch.setattr(server, "is_public_address", lambda address: address == "127.0.0.1")
+
+
+def run(coro_factory, monkeypatch):
+    async def main():
+        client = server.make_image_http_client()
+        monkeypatch.setattr(server, "image_http_client", client)
+        try:
+            return await coro_factory()
+        finally:
+            await client.aclose()
+    return asyncio.run(main())
+
+
+def test_resizes_and_transcodes(stub, allow_stub_host, monkeypatch):
+    response = run(lambda: server.proxy_image(url=f"{stub}/big.jpg", w=300, format="webp"), monkeypatch)
+
+    assert response.media_type == "image/webp"
+    assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+    with Image.open(response.path) as img:
+        assert img.format == "WEBP"
+        assert img.size == (300, 150)
+
+
+def test_cache_hit_does_not_refetch(stub, allow_stub_host, monkeypatch):
+    async def twice():
+        first = await server.proxy_image(url=f"{stub}/big.jpg", w=200, format="jpeg")
+        second = await server.proxy_image(url=f"{stub}/big.jpg", w=200, format="jpeg")
+        return first, second
+
+    first, second = run(twice, monkeypatch)
+    assert first.path == second.path
+    assert StubHandler.hits["/big.jpg"] == 1
+
+
+def test_concurrent_misses_share_one_fetch(stub, allow_stub_host, monkeypatch):
+    StubHandler.delay = 0.2
+
+    async def many():
+        return await asyncio.gather(*[
+            server.proxy_image(url=f"{stub}/big.jpg", w=300, format="png") for _ in range(5)
+        ])
+
+    responses = run(many, monkeypatch)
+    assert len({r.path for r in responses}) == 1
+    assert StubHandler.hits["/big.jpg"] == 1
+
+
+def test_cancelled_leader_does_not_fail_followers(stub, allow_stub_host, monkeypatch):
+    StubHandler.delay = 0.2
+
+    async def scenario():
+        url = f"{stub}/big.jpg"
+        leader = asyncio.create_task(server.proxy_image(url=url, w=300, format="webp"))
+        await asyncio.sleep(0.05)
+        followers = [asyncio.create_task(server.proxy_image(url=url, w=300, format="webp")) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        leader.cancel()
+        return await asyncio.gather(*followers)
+
+    responses = run(scenario, monkeypatch)
+    assert all(r.media_type == "image/webp" for r in responses)
+    assert StubHandler.hits["/big.jpg"] == 1
+
+
+def test_svg_is_served_with_restrictive_headers(stub, allow_stub_host, monkeypatch):
+    response = run(lambda: server.proxy_image(url=f"{stub}/logo.svg", w=300, format="webp"), monkeypatch)
+
+    assert response.media_type == "image/svg+xml"
+    assert "default-src 'none'" in response.headers["content-security-policy"]
+    assert response.headers["content-disposition"] == "attachment"
+    assert response.headers["x-content-type-options"] == "nosniff"
+
+
+def test_non_image_is_rejected(stub, allow_stub_host, monkeypatch):
+    with pytest.raises(HTTPException) as exc:
+        run(lambda: server.proxy_image(url=f"{stub}/page.html", w=300, format="webp"), monkeypatch)
+    assert exc.value.status_code == 502
+
+
+@pytest.mark.parametrize("path", ["/big.jpg", "/missing.png"])
+def test_loopback_is_refused_with_a_generic_error(stub, monkeypatch, path):
+    with pytest.raises(HTTPException) as exc:
+        run(lambda: server.proxy_image(url=f"{stub}{path}", w=300, format="webp"), monkeypatch)
+
+    assert exc.value.status_code == 502
+    assert exc.value.detail == "Image could not be fetched"
+    assert sum(StubHandler.hits.values()) == 0
+
+
+def test_redirect_to_internal_address_is_refused(stub, allow_stub_host, monkeypatch, caplog):
+    with pytest.raises(HTTPException):
+        run(lambda: server.proxy_image(url=f"{stub}/redirect-internal", w=300, format="webp"), monkeypatch)
+
+    assert StubHandler.hits["/redirect-internal"] == 1
+    assert "non-public address" in caplog.text
+
+
+@pytest.mark.parametrize("path", ["/truncated.jpg", "/bomb.png", "/over-cap.png"])
+def test_undecodable_images_are_a_502(stub, allow_stub_host, monkeypatch, caplog, path):
+    with pytest.raises(HTTPException) as exc:
+        run(lambda: server.proxy_image(url=f"{stub}{path}", w=300, format="webp"), monkeypatch)
+
+    assert exc.value.status_code == 502
+    assert StubHandler.hits[path] == 1
+    assert "Image proxy refused" in caplog.text
+
+
+def test_connects_to_the_vetted_address_with_the_original_host(stub, allow_stub_host, monkeypatch):
+    port = stub.rsplit(":", 1)[1]
+
+    async def lookup(host, port):
+        assert host == "images.example"
+        return ["127.0.0.1"]
+
+    monkeypatch.setattr(server, "lookup_host", lookup)
+    response = run(lambda: server.proxy_image(url=f"http://images.example:{port}/big.jpg", w=300, format="webp"), monkeypatch)
+
+    assert response.media_type == "image/webp"
+    assert StubHandler.hosts == [f"images.example:{port}"]
+
+
+def test_dns_rebinding_cannot_swap_the_address(stub, monkeypatch, caplog):
+    port = stub.rsplit(":", 1)[1]
+    answers = [["127.0.0.2"], ["127.0.0.1"]]
+
+    async def lookup(host, port):
+        return answers.pop(0)
+
+    # Only the first answer counts as public; a second lookup would rebind to the stub
+    monkeypatch.setattr(server, "is_public_address", lambda address: address == "127.0.0.2")
+    monkeypatch.setattr(server, "lookup_host", lookup)
+    with pytest.raises(HTTPException):
+        run(lambda: server.proxy_image(url=f"http://images.example:{port}/big.jpg", w=300, format="webp"), monkeypatch)
+
+    assert len(answers) == 1
+    assert sum(StubHandler.hits.values()) == 0
+
+
+def test_host_outside_the_allowlist_is_refused(stub, allow_stub_host, monkeypatch, caplog):
+    port = stub.rsplit(":", 1)[1]
+    with pytest.raises(HTTPException):
+        run(lambda: server.proxy_image(url=f"http://localhost:{port}/big.jpg", w=300, format="webp"), monkeypatch)
+
+    assert "not an allowed image host" in caplog.text
+    assert sum(StubHandler.hits.values()) == 0
+
+
+@pytest.mark.parametrize("url", [
+    "http://api.dicebear.com:8080/a.png",
+    "http://user:pw@api.dicebear.com/a.png",
+    "file:///etc/passwd",
+])
+def test_check_image_url_rejects_unsupported_urls(url):
+    with pytest.raises(server.ImageFetchError):
+        asyncio.run(server.check_image_url(url))
+
+
+@pytest.mark.parametrize("addresses", [
+    ["169.254.169.254"],
+    ["10.0.0.1"],
+    ["::1"],
+    ["93.184.216.34", "127.0.0.1"],
+])
+def test_resolve_public_address_rejects_internal_targets(monkeypatch, addresses):
+    async def lookup(host, port):
+        return addresses
+
+    monkeypatch.setattr(server, "lookup_host", lookup)
+    with pytest.raises(server.ImageFetchError):
+        asyncio.run(server.resolve_public_address("images.example", 80))
+
+
+def test_is_public_address():
+    assert server.is_public_address("93.184.216.34")
+    assert not server.is_public_address("127.0.0.1")
+    assert not server.is_public_address("192.168.1.10")
+    assert not server.is_public_address("::ffff:10.0.0.1")
+
+
+def test_cache_load_is_idempotent(tmp_path):
+    for i, name in enumerate(["a.webp", "b.webp", "c.webp"]):
+        (tmp_path / name).write_bytes(b"x" * 100)
+        os.utime(tmp_path / name, (1000 + i, 1000 + i))
+    (tmp_path / "d.webp.tmp").write_bytes(b"partial")
+    cache = server.ImageCache(tmp_path, 250)
+
+    async def load_twice():
+        await cache.load()
+        await cache.load()
+
+    asyncio.run(load_twice())
+    # The oldest file is evicted to fit 250 bytes, and nothing is counted twice
+    assert list(cache._entries) == ["b.webp", "c.webp"]
+    assert cache._total == 200
+    assert not (tmp_path / "a.webp").exists()
+
+
+def test_cache_load_keeps_entries_added_meanwhile(tmp_path):
+    (tmp_path / "old.webp").write_bytes(b"x" * 100)
+    cache = server.ImageCache(tmp_path, 1000)
+
+    async def scenario():
+        await cache.put("new.webp", b"y" * 50)
+        await cache.load()
+
+    asyncio.run(scenario())
+    assert list(cache._entries) == ["old.webp", "new.webp"]
+    assert cache._total == 150
@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+from starlette.testclient import TestClient
+
+import server
+
+
+@pytest.fixture
+def warmup_state(monkeypatch):
+    state = {"ready": False, "error": None, "completed_at": None}
+    monkeypatch.setattr(server, "warmup_state", state)
+    return state
+
+
+def test_warm_up_retries_any_failing_step(monkeypatch, warmup_state):
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RuntimeError("preload failed")
+
+    monkeypatch.setattr(server, "warm_up_once", flaky)
+    monkeypatch.setattr(server, "WARMUP_RETRY_DELAY", 0)
+    asyncio.run(server.warm_up())
+
+    assert len(attempts) == 3
+    assert warmup_state["ready"] is True
+    assert warmup_state["error"] is None
+
+
+def test_readyz_reports_error_until_ready(warmup_state):
+    app = server.FastAPI()
+    app.get("/readyz")(server.readyz)
+    client = TestClient(app)
+
+    warmup_state["error"] = "mongo down"
+    response = client.get("/readyz")
+    assert response.status_code == 503
+    assert response.json()["error"] == "mongo down"
+
+    warmup_state.update(ready=True, error=None, completed_at="now")
+    assert client.get("/readyz").status_code == 200
+
+
+def test_readyz_does_not_touch_read_cache(warmup_state):
+    warmup_state["ready"] = True
+    server.read_cache.set("settings", {"site": "cached"})
+    try:
+        asyncio.run(server.readyz())
+        assert server.read_cache.get("settings") == {"site": "cached"}
+    finally:
+        server.read_cache.invalidate("settings")
@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+
+@pytest.fixture(autouse=True)
+def clear_read_cache():
+    yield
+    server.read_cache.invalidate("videos:")
+
+
+def stored(fake_db):
+    return {(d["user_id"], d["video_id"]): d for d in fake_db.watch_progress.docs}
+
+
+def test_record_keeps_only_latest_position(fake_db):
+    buffer = server.WatchProgressBuffer()
+    buffer.record("alice", "v1", 10, 100)
+    buffer.record("alice", "v1", 20, 100)
+    buffer.record("alice", "v2", 99, 100)
+
+    assert asyncio.run(buffer.flush()) == 2
+    rows = stored(fake_db)
+    assert rows[("alice", "v1")]["position"] == 20
+    assert rows[("alice", "v2")]["completed"] is True
+
+
+def test_flush_single_user_leaves_others_pending(fake_db):
+    buffer = server.WatchProgressBuffer()
+    buffer.record("alice", "v1", 10, None)
+    buffer.record("bob", "v1", 10, None)
+
+    assert asyncio.run(buffer.flush("alice")) == 1
+    assert list(stored(fake_db)) == [("alice", "v1")]
+    assert asyncio.run(buffer.flush()) == 1
+    assert ("bob", "v1") in stored(fake_db)
+
+
+def test_failed_flush_requeues_without_clobbering_newer_heartbeat(fake_db):
+    buffer = server.WatchProgressBuffer()
+    buffer.record("alice", "v1", 10, None)
+    buffer.record("alice", "v2", 10, None)
+
+    async def fail(*args):
+        buffer.record("alice", "v1", 50, None)
+        raise RuntimeError("mongo down")
+
+    fake_db.watch_progress.before_write = fail
+    with pytest.raises(RuntimeError):
+        asyncio.run(buffer.flush())
+
+    fake_db.watch_progress.before_write = None
+    asyncio.run(buffer.flush())
+    rows = stored(fake_db)
+    assert rows[("alice", "v1")]["position"] == 50
+    assert rows[("alice", "v2")]["position"] == 10
+
+
+def test_cancelled_flush_requeues_entries(fake_db):
+    buffer = server.WatchProgressBuffer()
+    buffer.record("alice", "v1", 10, None)
+
+    async def scenario():
+        started = asyncio.Event()
+
+        async def hang(*args):
+            started.set()
+            await asyncio.sleep(10)
+
+        fake_db.watch_progress.before_write = hang
+        task = asyncio.create_task(buffer.flush())
+        await started.wait()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        fake_db.watch_progress.before_write = None
+        return await buffer.flush()
+
+    assert asyncio.run(scenario()) == 1
+    assert stored(fake_db)[("alice", "v1")]["position"] == 10
+
+
+def test_remove_waits_for_inflight_flush(fake_db):
+    buffer = server.WatchProgressBuffer()
+    buffer.record("alice", "v1", 10, None)
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def slow(*args):
+            if args[0] == "bulk_write":
+                await release.wait()
+
+        fake_db.watch_progress.before_write = slow
+        flush = asyncio.create_task(buffer.flush())
+        await asyncio.sleep(0)
+        remove = asyncio.create_task(buffer.remove("alice", "v1"))
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(flush, remove)
+
+    asyncio.run(scenario())
+    assert stored(fake_db) == {}
+
+
+def test_heartbeat_for_unknown_video_is_rejected(fake_db):
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(server.update_watch_progress("nope", server.WatchProgressUpdate(position=1), user={"username": "alice"}))
+    assert exc.value.status_code == 404
+
+
+def test_heartbeat_for_known_video_is_buffered(fake_db, monkeypatch):
+    buffer = server.WatchProgressBuffer()
+    monkeypatch.setattr(server, "watch_progress_buffer", buffer)
+    fake_db.videos.docs.append({"id": "v1"})
+
+    asyncio.run(server.update_watch_progress("v1", server.WatchProgressUpdate(position=5), user={"username": "alice"}))
+    assert asyncio.run(buffer.flush()) == 1